@@ -13,7 +13,7 @@ if config.config_file_name is not None:
     fileConfig(config.config_file_name)
 
 from app.core.database import Base
-from app.models import TopChannel
+import app.models  # noqa: F401  registers every model on Base.metadata
 
 target_metadata = Base.metadata
 
@@ -33,7 +33,7 @@ def do_run_migrations(connection: Connection):
 
 async def run_migrations_online():
     connectable = async_engine_from_config(
-        {"sqlalchemy.url": get_url()}, prefix="",
+        {"sqlalchemy.url": get_url()}, prefix="sqlalchemy.",
         poolclass=pool.NullPool,
     )
     async with connectable.connect() as connection:
@@ -0,0 +1,61 @@
+"""baseline schema created by Base.metadata.create_all
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-16
+
+Databases that were bootstrapped by the app's create_all already have these tables,
+so each one is only created when missing and `alembic upgrade head` works on both
+fresh and existing databases.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+
+    if not inspector.has_table("top_channels"):
+        op.create_table(
+            "top_channels",
+            sa.Column("id", sa.BigInteger(), primary_key=True, autoincrement=True),
+            sa.Column("country_code", sa.String(2), nullable=False),
+            sa.Column("channel_id", sa.String(255), nullable=False),
+            sa.Column("title", sa.String(255), nullable=False),
+            sa.Column("description", sa.Text(), nullable=True),
+            sa.Column("thumbnail_url", sa.String(500), nullable=True),
+            sa.Column("subscriber_count", sa.BigInteger(), nullable=False),
+            sa.Column("video_count", sa.BigInteger(), nullable=False),
+            sa.Column("view_count", sa.BigInteger(), nullable=False),
+            sa.Column("custom_url", sa.String(255), nullable=True),
+            sa.Column("published_at", sa.String(50), nullable=True),
+            sa.Column("rank", sa.BigInteger(), nullable=False),
+            sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.UniqueConstraint("country_code", "rank", name="uq_country_rank"),
+        )
+        op.create_index("ix_top_channels_country_code", "top_channels", ["country_code"])
+
+    if not inspector.has_table("search_results"):
+        op.create_table(
+            "search_results",
+            sa.Column("id", sa.BigInteger(), primary_key=True, autoincrement=True),
+            sa.Column("search_query", sa.String(255), nullable=False),
+            sa.Column("search_date", sa.Date(), nullable=False),
+            sa.Column("max_results", sa.Integer(), nullable=False),
+            sa.Column("result_count", sa.Integer(), nullable=False),
+            sa.Column("channels_data", sa.JSON(), nullable=False),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+        op.create_index("ix_search_results_search_query", "search_results", ["search_query"])
+        op.create_index("ix_search_results_search_date", "search_results", ["search_date"])
+
+
+def downgrade():
+    op.drop_table("search_results")
+    op.drop_table("top_channels")
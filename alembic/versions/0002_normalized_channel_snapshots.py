@@ -0,0 +1,147 @@
+"""normalize trending channels into channels, snapshots and appearances
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-16
+
+Moves the search_results.channels_data JSON blobs into:
+- channels: one row per channel (latest snippet)
+- channel_stats_snapshots: statistics per (channel_id, captured_at)
+- trending_appearances: ranked channels per (region, date, max_results)
+
+Existing blobs are backfilled with set-based SQL, using each row's created_at as the
+snapshot time, and the blob column is dropped afterwards.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+
+    if not inspector.has_table("channels"):
+        op.create_table(
+            "channels",
+            sa.Column("channel_id", sa.String(255), primary_key=True),
+            sa.Column("title", sa.String(255), nullable=False),
+            sa.Column("description", sa.Text(), nullable=True),
+            sa.Column("thumbnail_url", sa.String(500), nullable=True),
+            sa.Column("custom_url", sa.String(255), nullable=True),
+            sa.Column("country", sa.String(2), nullable=True),
+            sa.Column("published_at", sa.String(50), nullable=True),
+            sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+
+    if not inspector.has_table("channel_stats_snapshots"):
+        op.create_table(
+            "channel_stats_snapshots",
+            sa.Column("channel_id", sa.String(255), sa.ForeignKey("channels.channel_id"), primary_key=True),
+            sa.Column("captured_at", sa.DateTime(timezone=True), primary_key=True),
+            sa.Column("subscriber_count", sa.BigInteger(), nullable=False),
+            sa.Column("video_count", sa.BigInteger(), nullable=False),
+            sa.Column("view_count", sa.BigInteger(), nullable=False),
+        )
+
+    if not inspector.has_table("trending_appearances"):
+        op.create_table(
+            "trending_appearances",
+            sa.Column("region_code", sa.String(255), primary_key=True),
+            sa.Column("trending_date", sa.Date(), primary_key=True),
+            sa.Column("max_results", sa.Integer(), primary_key=True),
+            sa.Column("rank", sa.Integer(), primary_key=True),
+            sa.Column("channel_id", sa.String(255), sa.ForeignKey("channels.channel_id"), nullable=False),
+            sa.Column("video_appearances", sa.Integer(), nullable=False),
+            sa.Column("captured_at", sa.DateTime(timezone=True), nullable=False),
+        )
+        op.create_index(
+            "ix_trending_appearances_channel_date",
+            "trending_appearances",
+            ["channel_id", "trending_date"],
+        )
+
+    columns = {column["name"] for column in inspector.get_columns("search_results")}
+    if "channels_data" not in columns:
+        return
+
+    op.execute("""
+        INSERT INTO channels (channel_id, title, description, thumbnail_url, custom_url, country, published_at, updated_at)
+        SELECT DISTINCT ON (ch->>'channelId')
+            ch->>'channelId',
+            ch->>'title',
+            ch->>'description',
+            ch->>'thumbnailUrl',
+            ch->>'customUrl',
+            NULLIF(ch->>'country', ''),
+            ch->>'publishedAt',
+            COALESCE(sr.created_at, now())
+        FROM search_results sr, json_array_elements(sr.channels_data) AS ch
+        ORDER BY ch->>'channelId', sr.created_at DESC
+        ON CONFLICT (channel_id) DO NOTHING
+    """)
+
+    op.execute("""
+        INSERT INTO channel_stats_snapshots (channel_id, captured_at, subscriber_count, video_count, view_count)
+        SELECT
+            ch->>'channelId',
+            COALESCE(sr.created_at, sr.search_date::timestamptz),
+            COALESCE((ch->>'subscriberCount')::bigint, 0),
+            COALESCE((ch->>'videoCount')::bigint, 0),
+            COALESCE((ch->>'viewCount')::bigint, 0)
+        FROM search_results sr, json_array_elements(sr.channels_data) AS ch
+        ON CONFLICT DO NOTHING
+    """)
+
+    op.execute("""
+        INSERT INTO trending_appearances (region_code, trending_date, max_results, rank, channel_id, video_appearances, captured_at)
+        SELECT
+            sr.search_query,
+            sr.search_date,
+            sr.max_results,
+            e.ordinality,
+            e.ch->>'channelId',
+            COALESCE((e.ch->>'videoAppearances')::int, 0),
+            COALESCE(sr.created_at, sr.search_date::timestamptz)
+        FROM search_results sr, json_array_elements(sr.channels_data) WITH ORDINALITY AS e(ch, ordinality)
+        ON CONFLICT DO NOTHING
+    """)
+
+    op.drop_column("search_results", "channels_data")
+
+
+def downgrade():
+    op.add_column("search_results", sa.Column("channels_data", sa.JSON(), nullable=True))
+
+    op.execute("""
+        UPDATE search_results sr
+        SET channels_data = COALESCE((
+            SELECT json_agg(json_build_object(
+                'channelId', c.channel_id,
+                'title', c.title,
+                'description', c.description,
+                'thumbnailUrl', c.thumbnail_url,
+                'subscriberCount', s.subscriber_count,
+                'videoCount', s.video_count,
+                'viewCount', s.view_count,
+                'customUrl', c.custom_url,
+                'country', COALESCE(c.country, ''),
+                'publishedAt', c.published_at,
+                'videoAppearances', a.video_appearances
+            ) ORDER BY a.rank)
+            FROM trending_appearances a
+            JOIN channels c ON c.channel_id = a.channel_id
+            JOIN channel_stats_snapshots s ON s.channel_id = a.channel_id AND s.captured_at = a.captured_at
+            WHERE a.region_code = sr.search_query
+              AND a.trending_date = sr.search_date
+              AND a.max_results = sr.max_results
+        ), '[]'::json)
+    """)
+    op.alter_column("search_results", "channels_data", nullable=False)
+
+    op.drop_table("trending_appearances")
+    op.drop_table("channel_stats_snapshots")
+    op.drop_table("channels")
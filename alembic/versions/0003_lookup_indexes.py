@@ -0,0 +1,59 @@
+"""composite indexes for the trending and top channel lookups
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-16
+
+- search_results: one unique (search_query, search_date, max_results) index replaces the
+  single-column search_query index. It answers the exact-day lookup and, scanned
+  backwards, the latest-day fallback, and stops duplicate rows for the same day.
+  Existing duplicates keep their newest row.
+- top_channels: ix_top_channels_country_code is a prefix of uq_country_rank, which
+  already serves ORDER BY country_code, rank, so it is dropped.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def index_names(inspector, table):
+    names = {index["name"] for index in inspector.get_indexes(table)}
+    names |= {constraint["name"] for constraint in inspector.get_unique_constraints(table)}
+    return names
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+
+    search_indexes = index_names(inspector, "search_results")
+    search_columns = {column["name"] for column in inspector.get_columns("search_results")}
+    # Tables created by a later create_all are keyed on these columns and have no id
+    if "id" in search_columns and "uq_search_results_query_date_size" not in search_indexes:
+        op.execute("""
+            DELETE FROM search_results a
+            USING search_results b
+            WHERE a.search_query = b.search_query
+              AND a.search_date = b.search_date
+              AND a.max_results = b.max_results
+              AND a.id < b.id
+        """)
+        op.create_unique_constraint(
+            "uq_search_results_query_date_size",
+            "search_results",
+            ["search_query", "search_date", "max_results"],
+        )
+    if "ix_search_results_search_query" in search_indexes:
+        op.drop_index("ix_search_results_search_query", table_name="search_results")
+
+    if "ix_top_channels_country_code" in index_names(inspector, "top_channels"):
+        op.drop_index("ix_top_channels_country_code", table_name="top_channels")
+
+
+def downgrade():
+    op.create_index("ix_top_channels_country_code", "top_channels", ["country_code"])
+    op.create_index("ix_search_results_search_query", "search_results", ["search_query"])
+    op.drop_constraint("uq_search_results_query_date_size", "search_results", type_="unique")
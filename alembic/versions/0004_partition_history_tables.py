@@ -0,0 +1,171 @@
+"""partition history tables by month
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-16
+
+search_results, trending_appearances and channel_stats_snapshots become RANGE
+partitioned tables with one partition per month, so 30-day retention drops whole
+partitions (app.core.partitions, run by the scheduler) instead of DELETE scans.
+
+Each table is renamed aside, recreated as a partitioned parent with partitions covering
+its existing rows through two months ahead, copied and dropped. search_results loses its
+surrogate id: a primary key on a partitioned table must include the partition column, and
+(search_query, search_date, max_results) already identifies a row.
+"""
+from datetime import date
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+MONTHS_AHEAD = 2
+
+
+def add_months(month, months):
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def create_search_results(partitioned):
+    if partitioned:
+        op.create_table(
+            "search_results",
+            sa.Column("search_query", sa.String(255), primary_key=True),
+            sa.Column("search_date", sa.Date(), primary_key=True),
+            sa.Column("max_results", sa.Integer(), primary_key=True),
+            sa.Column("result_count", sa.Integer(), nullable=False),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            postgresql_partition_by="RANGE (search_date)",
+        )
+        return
+
+    op.create_table(
+        "search_results",
+        sa.Column("id", sa.BigInteger(), primary_key=True, autoincrement=True),
+        sa.Column("search_query", sa.String(255), nullable=False),
+        sa.Column("search_date", sa.Date(), nullable=False),
+        sa.Column("max_results", sa.Integer(), nullable=False),
+        sa.Column("result_count", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.UniqueConstraint(
+            "search_query", "search_date", "max_results", name="uq_search_results_query_date_size"
+        ),
+    )
+    op.create_index("ix_search_results_search_date", "search_results", ["search_date"])
+
+
+def create_snapshots(partitioned):
+    op.create_table(
+        "channel_stats_snapshots",
+        sa.Column("channel_id", sa.String(255), sa.ForeignKey("channels.channel_id"), primary_key=True),
+        sa.Column("captured_at", sa.DateTime(timezone=True), primary_key=True),
+        sa.Column("subscriber_count", sa.BigInteger(), nullable=False),
+        sa.Column("video_count", sa.BigInteger(), nullable=False),
+        sa.Column("view_count", sa.BigInteger(), nullable=False),
+        **({"postgresql_partition_by": "RANGE (captured_at)"} if partitioned else {}),
+    )
+
+
+def create_appearances(partitioned):
+    op.create_table(
+        "trending_appearances",
+        sa.Column("region_code", sa.String(255), primary_key=True),
+        sa.Column("trending_date", sa.Date(), primary_key=True),
+        sa.Column("max_results", sa.Integer(), primary_key=True),
+        sa.Column("rank", sa.Integer(), primary_key=True),
+        sa.Column("channel_id", sa.String(255), sa.ForeignKey("channels.channel_id"), nullable=False),
+        sa.Column("video_appearances", sa.Integer(), nullable=False),
+        sa.Column("captured_at", sa.DateTime(timezone=True), nullable=False),
+        **({"postgresql_partition_by": "RANGE (trending_date)"} if partitioned else {}),
+    )
+    op.create_index(
+        "ix_trending_appearances_channel_date",
+        "trending_appearances",
+        ["channel_id", "trending_date"],
+    )
+
+
+# table, partition column, whether it is a timestamp, create function, copied columns
+TABLES = [
+    (
+        "search_results", "search_date", False, create_search_results,
+        ["search_query", "search_date", "max_results", "result_count", "created_at"],
+    ),
+    (
+        "trending_appearances", "trending_date", False, create_appearances,
+        ["region_code", "trending_date", "max_results", "rank", "channel_id", "video_appearances", "captured_at"],
+    ),
+    (
+        "channel_stats_snapshots", "captured_at", True, create_snapshots,
+        ["channel_id", "captured_at", "subscriber_count", "video_count", "view_count"],
+    ),
+]
+
+
+def is_partitioned(bind, table):
+    relkind = bind.execute(
+        sa.text("SELECT relkind::text FROM pg_class WHERE relname = :table AND relnamespace = 'public'::regnamespace"),
+        {"table": table},
+    ).scalar()
+    return relkind == "p"
+
+
+def bound(month, timestamp):
+    return f"{month.isoformat()} 00:00:00+00" if timestamp else month.isoformat()
+
+
+def create_partitions(bind, table, column, timestamp, source):
+    first = bind.execute(sa.text(
+        f"SELECT date_trunc('month', min({column}) AT TIME ZONE 'UTC')::date FROM {source}"
+        if timestamp else
+        f"SELECT date_trunc('month', min({column}))::date FROM {source}"
+    )).scalar()
+
+    current = date.today().replace(day=1)
+    month = min(first, current) if first else current
+    last = add_months(current, MONTHS_AHEAD)
+    while month <= last:
+        op.execute(
+            f"CREATE TABLE {table}_p{month.year:04d}_{month.month:02d} PARTITION OF {table} "
+            f"FOR VALUES FROM ('{bound(month, timestamp)}') TO ('{bound(add_months(month, 1), timestamp)}')"
+        )
+        month = add_months(month, 1)
+
+
+def rebuild(table, column, timestamp, create, columns, partitioned):
+    bind = op.get_bind()
+    old = f"{table}_old"
+
+    op.rename_table(table, old)
+    # Index names are schema-wide, so move the old ones out of the way first
+    for (name,) in bind.execute(
+        sa.text("SELECT indexname FROM pg_indexes WHERE tablename = :table"), {"table": old}
+    ).all():
+        op.execute(f"ALTER INDEX {name} RENAME TO {name}_old")
+
+    create(partitioned)
+    if partitioned:
+        create_partitions(bind, table, column, timestamp, old)
+
+    column_list = ", ".join(columns)
+    op.execute(f"INSERT INTO {table} ({column_list}) SELECT {column_list} FROM {old}")
+    op.drop_table(old)
+
+
+def upgrade():
+    bind = op.get_bind()
+    for table, column, timestamp, create, columns in TABLES:
+        # Databases bootstrapped by create_all already have partitioned tables
+        if not is_partitioned(bind, table):
+            rebuild(table, column, timestamp, create, columns, partitioned=True)
+
+
+def downgrade():
+    bind = op.get_bind()
+    for table, column, timestamp, create, columns in TABLES:
+        if is_partitioned(bind, table):
+            rebuild(table, column, timestamp, create, columns, partitioned=False)
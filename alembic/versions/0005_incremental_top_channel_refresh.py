@@ -0,0 +1,47 @@
+"""incremental top channel refresh
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-16
+
+- channels.last_fetched_at: when the top channels refresh last fetched the snippet.
+  Channels with a recent snippet only have their statistics fetched.
+- top_channel_refreshes: last completed refresh per country. The refresh now skips
+  unchanged ranks, so top_channels rows no longer say when the ranking was last
+  checked. Backfilled from the newest created_at per country (reset on every refresh
+  until now) so existing rankings stay fresh.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+
+    channel_columns = {column["name"] for column in inspector.get_columns("channels")}
+    if "last_fetched_at" not in channel_columns:
+        op.add_column("channels", sa.Column("last_fetched_at", sa.DateTime(timezone=True), nullable=True))
+
+    if not inspector.has_table("top_channel_refreshes"):
+        op.create_table(
+            "top_channel_refreshes",
+            sa.Column("country_code", sa.String(2), primary_key=True),
+            sa.Column("refreshed_at", sa.DateTime(timezone=True), nullable=False),
+        )
+        op.execute("""
+            INSERT INTO top_channel_refreshes (country_code, refreshed_at)
+            SELECT country_code, max(created_at)
+            FROM top_channels
+            WHERE created_at IS NOT NULL
+            GROUP BY country_code
+        """)
+
+
+def downgrade():
+    op.drop_table("top_channel_refreshes")
+    op.drop_column("channels", "last_fetched_at")
@@ -0,0 +1,80 @@
+"""tracked channel registry
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-16
+
+tracked_channels replaces the CHANNEL_IDS dict in app/services/channel_names.py as
+the list of channels the top channels refresh ranks per country. It is seeded with
+those IDs, earlier entries getting a higher priority; larger lists are loaded with
+scripts/import_tracked_channels.py.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+SEED_CHANNEL_IDS = {
+    "KR": [
+        "UCOmHUn--16B90oW2L6FRR3A",
+        "UC3IZKseVpdzPSBaWxBxundA",
+        "UCaO6TYtlC8U5ttz62hTrZgg",
+        "UClRNDVO8093rmRTtLe4GEPw",
+        "UC-8B0Vn_3fe6D6H5saNcGKQ",
+    ],
+    "JP": [
+        "UC-lHJZR3Gqxm24_Vd_AJ5Yw",
+        "UCJFZiqLMntJufDCHc6bQixg",
+        "UCp-5t9SrOQwXMU7iIjQfARg",
+        "UC67Wr_9pA4I0glIxDt_Cpyw",
+        "UCpko_-a4wgz2u_DgDgd9fqA",
+    ],
+    "US": [
+        "UCX6OQ3DkcsbYNE6H8uQQuVA",
+        "UCbCmjCuTUZos6Inko4u57UQ",
+        "UCJplp5SjeGSdVdwsfb9Q7lQ",
+        "UCqECaJ8Gagnn7YCbPEzWH6g",
+        "UCBR8-60-B28hp2BmDPdntcQ",
+    ],
+}
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+
+    if not inspector.has_table("tracked_channels"):
+        op.create_table(
+            "tracked_channels",
+            sa.Column("country_code", sa.String(2), primary_key=True),
+            sa.Column("channel_id", sa.String(255), primary_key=True),
+            sa.Column("priority", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("name", sa.String(255), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+        op.create_index(
+            "ix_tracked_channels_country_priority",
+            "tracked_channels",
+            ["country_code", "priority", "channel_id"],
+        )
+
+    tracked_channels = sa.table(
+        "tracked_channels",
+        sa.column("country_code", sa.String),
+        sa.column("channel_id", sa.String),
+        sa.column("priority", sa.Integer),
+    )
+    rows = [
+        {"country_code": country_code, "channel_id": channel_id, "priority": len(channel_ids) - index}
+        for country_code, channel_ids in SEED_CHANNEL_IDS.items()
+        for index, channel_id in enumerate(channel_ids)
+    ]
+    op.execute(pg_insert(tracked_channels).values(rows).on_conflict_do_nothing())
+
+
+def downgrade():
+    op.drop_index("ix_tracked_channels_country_priority", table_name="tracked_channels")
+    op.drop_table("tracked_channels")
@@ -1,8 +1,20 @@
-
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from app.core import metrics
+from app.services.warmup import is_ready
 
 router = APIRouter()
 
 @router.get("/healthz")
 async def healthz():
     return {"status": "ok"}
+
+@router.get("/readyz")
+async def readyz():
+    if not is_ready():
+        return JSONResponse({"status": "warming"}, status_code=503)
+    return {"status": "ready"}
+
+@router.get("/metrics")
+async def get_metrics():
+    return metrics.snapshot()
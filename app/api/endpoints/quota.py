@@ -0,0 +1,8 @@
+from fastapi import APIRouter
+from app.services.quota import get_quota_usage
+
+router = APIRouter(prefix="/api")
+
+@router.get("/quota")
+async def get_quota():
+    return await get_quota_usage()
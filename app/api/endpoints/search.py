@@ -1,35 +1,63 @@
 
-from fastapi import APIRouter, Query, Depends
-from app.services.search_service import get_trending_channels_with_cache
-from app.services.youtube_client import get_i18n_regions
+from fastapi import APIRouter, Query, Depends, Request, Response
+from app.services.search_service import get_regions_response, get_trending_channels_with_cache
 from app.core.database import get_db
-from app.core.redis import cache_get, cache_set
+from app.core.response_cache import (
+    to_response, make_etag, matching_etag, not_modified, accepts_gzip, gzip_etag
+)
+from app.core.formats import OUTPUT_FORMATS, format_channel_list, parse_fields, project_channels
+from app.core.settings import settings
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Dict, Any, List
+from datetime import date
+from typing import Dict, List, Optional
 import logging
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api")
 
-@router.get("/regions")
-async def get_regions_endpoint() -> List[Dict[str, str]]:
-    cache_key = "youtube_regions"
-    cached_regions = await cache_get(cache_key)
+REGIONS_CACHE_CONTROL = "public, max-age=86400, stale-while-revalidate=604800"
+TRENDING_CACHE_CONTROL = "public, max-age=600, stale-while-revalidate=3600"
 
-    if cached_regions:
-        logger.info("Returning regions from cache")
-        return cached_regions
-
-    regions = await get_i18n_regions()
-    await cache_set(cache_key, regions, ttl=86400)
-
-    return regions
+@router.get("/regions", response_model=List[Dict[str, str]])
+async def get_regions_endpoint(request: Request) -> Response:
+    entry = await get_regions_response()
+    return to_response(request, entry, cache_control=REGIONS_CACHE_CONTROL)
 
 @router.get("/trending/channels")
 async def get_trending_channels_endpoint(
+    request: Request,
     region_code: str = Query(default="KR", description="Region code (KR, JP, US, etc)"),
     max_results: int = Query(default=50, ge=1, le=50, description="Maximum number of results"),
+    output_format: str = Query(default="json", alias="format", pattern=f"^({'|'.join(OUTPUT_FORMATS)})$", description="Output format"),
+    fields: Optional[str] = Query(default=None, description="Comma separated channel fields, e.g. channelId,title,subscriberCount"),
     db: AsyncSession = Depends(get_db)
-) -> Dict[str, Any]:
-    return await get_trending_channels_with_cache(db, region_code, max_results)
+) -> Response:
+    field_list = parse_fields(fields)
+
+    # A day's ranking is written once, so the date identifies the data and a client
+    # holding today's tag can be answered before any cache or database lookup
+    etag = make_etag(
+        "trending", region_code, date.today().isoformat(), max_results, output_format, ",".join(field_list or [])
+    )
+    matched = matching_etag(request, etag)
+    if matched:
+        return not_modified(matched, TRENDING_CACHE_CONTROL)
+
+    result = await get_trending_channels_with_cache(db, region_code, max_results)
+    if field_list:
+        result = {**result, "channels": project_channels(result["channels"], field_list)}
+
+    cacheable = not (result.get("stale") or result.get("error"))
+    headers = {
+        "Vary": "Accept-Encoding",
+        "Cache-Control": TRENDING_CACHE_CONTROL if cacheable else "no-cache",
+    }
+    response = format_channel_list(result, output_format, headers)
+
+    if cacheable:
+        # GZipMiddleware compresses bodies of at least gzip_minimum_size for gzip clients,
+        # so only those responses carry the gzip variant tag
+        compressed = accepts_gzip(request) and len(response.body) >= settings.gzip_minimum_size
+        response.headers["ETag"] = gzip_etag(etag) if compressed else etag
+    return response
@@ -1,17 +1,20 @@
-
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_db
-from app.services.top_channels_service import get_top_channels_from_db, update_top_channels, has_today_data
+from app.core.response_cache import matching_etag, not_modified, to_response
+from app.services.top_channels_service import get_top_channels_etag, get_top_channels_response
 
 router = APIRouter(prefix="/api")
 
-@router.get("/top-channels")
-async def get_top_channels(db: AsyncSession = Depends(get_db)):
-    has_data = await has_today_data(db)
+# The ranking changes once a month; clients revalidate hourly and may keep showing
+# the previous copy for a day while they do
+CACHE_CONTROL = "public, max-age=3600, stale-while-revalidate=86400"
 
-    if not has_data:
-        await update_top_channels()
+@router.get("/top-channels")
+async def get_top_channels(request: Request, db: AsyncSession = Depends(get_db)):
+    matched = matching_etag(request, await get_top_channels_etag())
+    if matched:
+        return not_modified(matched, CACHE_CONTROL)
 
-    result = await get_top_channels_from_db(db)
-    return result
+    entry, etag = await get_top_channels_response(db)
+    return to_response(request, entry, etag=etag, cache_control=CACHE_CONTROL)
@@ -1,13 +1,50 @@
-
+from uuid import uuid4
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import NullPool
+from app.core import metrics
 from app.core.settings import settings
 
-engine = create_async_engine(settings.database_url, echo=False)
+
+def engine_options() -> dict:
+    options = {"echo": False, "pool_pre_ping": settings.db_pool_pre_ping}
+
+    if settings.db_null_pool:
+        options["poolclass"] = NullPool
+    else:
+        options.update(
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+            pool_recycle=settings.db_pool_recycle,
+        )
+
+    if settings.db_pgbouncer:
+        options["connect_args"] = {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            # asyncpg still prepares every statement; unique names keep them from
+            # colliding on a server connection shared with other clients
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        }
+
+    return options
+
+
+engine = create_async_engine(settings.database_url, **engine_options())
 async_session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 Base = declarative_base()
 
+
+@event.listens_for(engine.sync_engine, "checkout")
+def _count_checkout(dbapi_connection, connection_record, connection_proxy):
+    metrics.incr("db.checkout")
+
+
 async def get_db():
+    # AsyncSession checks out a connection on its first query only, so requests served
+    # from the cache (or answered with 304) never touch the pool
     async with async_session_maker() as session:
         yield session
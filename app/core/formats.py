@@ -0,0 +1,57 @@
+import io
+from typing import Any, Dict, List, Optional
+from fastapi import Response
+from fastapi.responses import JSONResponse
+import msgpack
+import polars as pl
+
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+OUTPUT_FORMATS = ("json", "arrow", "msgpack")
+
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    if not fields:
+        return None
+    return [field.strip() for field in fields.split(",") if field.strip()]
+
+
+def project_channels(channels: List[Dict[str, Any]], fields: Optional[List[str]]) -> List[Dict[str, Any]]:
+    if not fields:
+        return channels
+    return [{field: channel[field] for field in fields if field in channel} for channel in channels]
+
+
+def channels_to_arrow(channels: List[Dict[str, Any]]) -> bytes:
+    # One record batch of the channel rows; the envelope (regionCode, stale, ...) goes
+    # in headers since it isn't columnar
+    buffer = io.BytesIO()
+    pl.DataFrame(channels).write_ipc_stream(buffer)
+    return buffer.getvalue()
+
+
+# Envelope fields of a channel list sent as headers alongside an Arrow body
+ARROW_META_HEADERS = {
+    "regionCode": "X-Region-Code",
+    "result_count": "X-Result-Count",
+    "stale": "X-Stale",
+    "searchDate": "X-Search-Date",
+}
+
+
+def format_channel_list(
+    payload: Dict[str, Any],
+    output_format: str,
+    headers: Dict[str, str],
+) -> Response:
+    # Error payloads stay JSON so every client can read the message
+    if output_format == "json" or payload.get("error"):
+        return JSONResponse(payload, headers=headers)
+
+    if output_format == "msgpack":
+        return Response(msgpack.packb(payload), media_type=MSGPACK_MEDIA_TYPE, headers=headers)
+
+    for key, header in ARROW_META_HEADERS.items():
+        if key in payload:
+            headers[header] = str(payload[key])
+    return Response(channels_to_arrow(payload["channels"]), media_type=ARROW_MEDIA_TYPE, headers=headers)
@@ -0,0 +1,46 @@
+import httpx
+import logging
+from typing import Optional
+from app.core.settings import settings
+
+logger = logging.getLogger(__name__)
+
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def build_http_client() -> httpx.AsyncClient:
+    limits = httpx.Limits(
+        max_connections=settings.http_max_connections,
+        max_keepalive_connections=settings.http_max_keepalive_connections,
+        keepalive_expiry=settings.http_keepalive_expiry,
+    )
+    return httpx.AsyncClient(
+        http2=settings.http2_enabled,
+        limits=limits,
+        timeout=settings.http_timeout,
+    )
+
+
+async def init_http_client() -> httpx.AsyncClient:
+    global _http_client
+
+    if _http_client is None:
+        _http_client = build_http_client()
+        logger.info(
+            f"Shared HTTP client started (http2={settings.http2_enabled}, "
+            f"max_connections={settings.http_max_connections})"
+        )
+    return _http_client
+
+
+async def close_http_client() -> None:
+    global _http_client
+
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+        logger.info("Shared HTTP client closed")
+
+
+def get_http_client() -> Optional[httpx.AsyncClient]:
+    return _http_client
@@ -0,0 +1,22 @@
+from collections import Counter
+from typing import Dict
+
+_counters: Counter = Counter()
+_gauges: Dict[str, int] = {}
+
+
+def incr(name: str, value: int = 1) -> None:
+    _counters[name] += value
+
+
+def gauge(name: str, value: int) -> None:
+    _gauges[name] = value
+
+
+def snapshot() -> Dict[str, int]:
+    return dict(sorted({**_counters, **_gauges}.items()))
+
+
+def reset() -> None:
+    _counters.clear()
+    _gauges.clear()
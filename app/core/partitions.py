@@ -0,0 +1,146 @@
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+from app.core.database import engine
+from app.core.redis import acquire_lock, release_lock
+from app.core.settings import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+# History tables partitioned by month on their date column. Retention drops whole
+# partitions, so nothing on the request path deletes rows.
+PARTITIONED_TABLES: Dict[str, str] = {
+    "search_results": "search_date",
+    "trending_appearances": "trending_date",
+    "channel_stats_snapshots": "captured_at",
+}
+TIMESTAMP_COLUMNS = {"captured_at"}
+MAINTENANCE_LOCK_NAME = "partition_maintenance"
+MAINTENANCE_LOCK_TTL = 300
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month.year:04d}_{month.month:02d}"
+
+
+def partition_month(table: str, name: str) -> Optional[date]:
+    suffix = name.removeprefix(f"{table}_p")
+    try:
+        year, month = suffix.split("_")
+        return date(int(year), int(month), 1)
+    except ValueError:
+        return None
+
+
+def partition_bound(column: str, month: date) -> str:
+    # Timestamp partitions are cut at UTC midnight regardless of the session time zone
+    if column in TIMESTAMP_COLUMNS:
+        return f"{month.isoformat()} 00:00:00+00"
+    return month.isoformat()
+
+
+def create_partition_sql(table: str, column: str, month: date) -> str:
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(table, month)} PARTITION OF {table} "
+        f"FOR VALUES FROM ('{partition_bound(column, month)}') "
+        f"TO ('{partition_bound(column, add_months(month, 1))}')"
+    )
+
+
+async def is_partitioned(conn: AsyncConnection, table: str) -> bool:
+    result = await conn.execute(
+        text("SELECT relkind::text FROM pg_class WHERE relname = :table AND relnamespace = 'public'::regnamespace"),
+        {"table": table},
+    )
+    return result.scalar() == "p"
+
+
+async def list_partitions(conn: AsyncConnection, table: str) -> List[str]:
+    result = await conn.execute(
+        text("""
+            SELECT child.relname
+            FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE parent.relname = :table
+        """),
+        {"table": table},
+    )
+    return [row[0] for row in result]
+
+
+async def ensure_partitions(
+    conn: AsyncConnection,
+    today: date,
+    months_ahead: Optional[int] = None,
+    months_back: int = 0,
+) -> List[str]:
+    if months_ahead is None:
+        months_ahead = settings.partition_months_ahead
+
+    created = []
+    current = month_start(today)
+    for table, column in PARTITIONED_TABLES.items():
+        if not await is_partitioned(conn, table):
+            logger.warning(f"{table} is not partitioned, run 'alembic upgrade head'")
+            continue
+
+        existing = set(await list_partitions(conn, table))
+        for offset in range(-months_back, months_ahead + 1):
+            month = add_months(current, offset)
+            if partition_name(table, month) in existing:
+                continue
+            await conn.execute(text(create_partition_sql(table, column, month)))
+            created.append(partition_name(table, month))
+    return created
+
+
+async def drop_expired_partitions(conn: AsyncConnection, today: date, retention_days: int) -> List[str]:
+    # A partition goes once its whole month is older than the retention window, so
+    # between retention_days and retention_days + one month of history is kept
+    cutoff = today - timedelta(days=retention_days)
+
+    dropped = []
+    for table in PARTITIONED_TABLES:
+        for name in await list_partitions(conn, table):
+            month = partition_month(table, name)
+            if month is None or add_months(month, 1) > cutoff:
+                continue
+            await conn.execute(text(f"DROP TABLE IF EXISTS {name}"))
+            dropped.append(name)
+    return dropped
+
+
+async def maintain_partitions():
+    # Runs at startup and daily in every worker; the lock leaves the DDL to one of them
+    token = await acquire_lock(MAINTENANCE_LOCK_NAME, ttl=MAINTENANCE_LOCK_TTL)
+    if token is None:
+        logger.info("Partition maintenance already running on another worker")
+        return
+
+    today = date.today()
+    try:
+        async with engine.begin() as conn:
+            created = await ensure_partitions(conn, today)
+            dropped = await drop_expired_partitions(conn, today, settings.history_retention_days)
+    except Exception as e:
+        logger.error(f"Partition maintenance failed: {e}")
+        return
+    finally:
+        await release_lock(MAINTENANCE_LOCK_NAME, token)
+
+    if created:
+        logger.info(f"Created partitions: {', '.join(created)}")
+    if dropped:
+        logger.info(f"Dropped expired partitions: {', '.join(dropped)}")
@@ -1,88 +1,588 @@
 import redis.asyncio as redis
+import asyncio
 import json
 import logging
-from typing import Any, Optional
+import uuid
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from app.core import metrics
+from app.core.local_cache import LocalCache, MISSING
 from app.core.settings import settings
 
 logger = logging.getLogger(__name__)
 
+INVALIDATION_CHANNEL = "cache:invalidate"
+CLEAR_BATCH_SIZE = 500
+
 _redis_client: Optional[redis.Redis] = None
+_l1 = LocalCache(settings.l1_cache_max_entries)
+_instance_id = uuid.uuid4().hex
+_listener_task: Optional[asyncio.Task] = None
+
+# Circuit breaker: after redis_breaker_threshold consecutive connection failures every
+# caller skips Redis at once instead of waiting out a socket timeout, and a background
+# probe closes the breaker again once PING succeeds
+_consecutive_failures = 0
+_breaker_open = False
+_probe_task: Optional[asyncio.Task] = None
+
+CONNECTION_ERRORS = (redis.ConnectionError, redis.TimeoutError, ConnectionError, OSError)
+
+
+def breaker_is_open() -> bool:
+    return _breaker_open
+
+
+def record_redis_success() -> None:
+    global _consecutive_failures
+    _consecutive_failures = 0
+
+
+def record_redis_failure(error: Exception) -> None:
+    global _consecutive_failures
+
+    # Only connectivity problems count; a bad command or payload says nothing about the server
+    if not isinstance(error, CONNECTION_ERRORS):
+        return
+
+    _consecutive_failures += 1
+    if not _breaker_open and _consecutive_failures >= settings.redis_breaker_threshold:
+        _open_breaker()
+
+
+def _open_breaker() -> None:
+    global _breaker_open, _probe_task
+
+    _breaker_open = True
+    metrics.incr("redis.breaker.opened")
+    metrics.gauge("redis.breaker.open", 1)
+    logger.warning(f"Redis circuit breaker opened after {_consecutive_failures} consecutive failures")
+
+    if _probe_task is None or _probe_task.done():
+        _probe_task = asyncio.create_task(_probe_until_healthy())
+
+
+def _close_breaker() -> None:
+    global _breaker_open, _consecutive_failures
+
+    _breaker_open = False
+    _consecutive_failures = 0
+    metrics.incr("redis.breaker.closed")
+    metrics.gauge("redis.breaker.open", 0)
+    logger.info("Redis circuit breaker closed")
+
+
+async def _probe_until_healthy() -> None:
+    backoff = settings.redis_breaker_backoff
+    while _breaker_open:
+        await asyncio.sleep(backoff)
+        try:
+            metrics.incr("redis.breaker.probes")
+            await _get_client().ping()
+            _close_breaker()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            backoff = min(backoff * 2, settings.redis_breaker_max_backoff)
+            logger.warning(f"Redis probe failed, retrying in {backoff:.1f}s: {e}")
 
 
-async def get_redis() -> redis.Redis:
+def _get_client() -> redis.Redis:
     global _redis_client
 
     if _redis_client is None:
+        _redis_client = redis.from_url(
+            settings.redis_url,
+            encoding="utf-8",
+            decode_responses=True,
+            max_connections=settings.redis_max_connections,
+            socket_timeout=settings.redis_socket_timeout,
+            socket_connect_timeout=settings.redis_socket_connect_timeout,
+            health_check_interval=settings.redis_health_check_interval,
+        )
+    return _redis_client
+
+
+async def get_redis() -> Optional[redis.Redis]:
+    # Returns None while the breaker is open so callers take their no-cache path
+    if _breaker_open:
+        metrics.incr("redis.breaker.skipped")
+        return None
+
+    first_use = _redis_client is None
+    client = _get_client()
+    if first_use:
         try:
-            _redis_client = await redis.from_url(
-                settings.redis_url,
-                encoding="utf-8",
-                decode_responses=True
-            )
-            await _redis_client.ping()
+            await client.ping()
             logger.info("Redis connection established")
         except Exception as e:
             logger.error(f"Failed to connect to Redis: {e}")
-            _redis_client = None
+            record_redis_failure(e)
+            return None
+
+    return client
 
-    return _redis_client
 
+async def close_redis() -> None:
+    global _redis_client, _probe_task, _breaker_open, _consecutive_failures
+
+    if _probe_task is not None:
+        _probe_task.cancel()
+        try:
+            await _probe_task
+        except asyncio.CancelledError:
+            pass
+        _probe_task = None
+
+    if _redis_client is not None:
+        await _redis_client.aclose()
+        _redis_client = None
+    _breaker_open = False
+    _consecutive_failures = 0
+
+
+def l1_ttl(redis_ttl_ms: Optional[int]) -> float:
+    # Never outlive the Redis entry, and cap staleness if an invalidation is missed
+    if redis_ttl_ms is None or redis_ttl_ms < 0:
+        return settings.l1_cache_max_ttl
+    return min(redis_ttl_ms / 1000, settings.l1_cache_max_ttl)
+
+
+async def publish_invalidation(
+    key: Optional[str] = None,
+    pattern: Optional[str] = None,
+    keys: Optional[List[str]] = None,
+) -> None:
+    try:
+        client = await get_redis()
+        if client is None:
+            return
+
+        message = json.dumps({"origin": _instance_id, "key": key, "pattern": pattern, "keys": keys})
+        await client.publish(INVALIDATION_CHANNEL, message)
+    except Exception as e:
+        record_redis_failure(e)
+        logger.error(f"Cache invalidation publish error for {key or pattern}: {e}")
+
+
+def apply_invalidation(message: str) -> None:
+    payload = json.loads(message)
+    if payload.get("origin") == _instance_id:
+        return
+
+    metrics.incr("cache.invalidations_received")
+    if payload.get("key"):
+        _l1.delete(payload["key"])
+    for key in payload.get("keys") or ():
+        _l1.delete(key)
+    if payload.get("pattern"):
+        _l1.delete_pattern(payload["pattern"])
+
+
+async def _listen_for_invalidations() -> None:
+    backoff = 1.0
+    while True:
+        pubsub = None
+        try:
+            client = await get_redis()
+            if client is None:
+                raise RuntimeError("Redis unavailable")
+
+            pubsub = client.pubsub(ignore_subscribe_messages=True)
+            await pubsub.subscribe(INVALIDATION_CHANNEL)
+            # Anything published while we were not subscribed is lost, so start clean
+            _l1.clear()
+            backoff = 1.0
+
+            async for message in pubsub.listen():
+                if message.get("type") == "message":
+                    apply_invalidation(message["data"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Cache invalidation listener error, retrying in {backoff:.0f}s: {e}")
+            record_redis_failure(e)
+            _l1.clear()
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30.0)
+        finally:
+            if pubsub is not None:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+
+def start_cache_invalidation_listener() -> None:
+    global _listener_task
+
+    if settings.l1_cache_enabled and _listener_task is None:
+        _listener_task = asyncio.create_task(_listen_for_invalidations())
+        logger.info("Cache invalidation listener started")
+
+
+async def stop_cache_invalidation_listener() -> None:
+    global _listener_task
+
+    if _listener_task is not None:
+        _listener_task.cancel()
+        try:
+            await _listener_task
+        except asyncio.CancelledError:
+            pass
+        _listener_task = None
+
+
+async def cache_get(key: str, loads: Callable[[str], Any] = json.loads) -> Optional[Any]:
+    # The in-process tier keeps the decoded value, so a hit skips loads entirely.
+    # Values served from it are shared objects; callers must not mutate them.
+    if settings.l1_cache_enabled:
+        value = _l1.get(key)
+        if value is not MISSING:
+            metrics.incr("cache.l1.hit")
+            return value
+        metrics.incr("cache.l1.miss")
 
-async def cache_get(key: str) -> Optional[Any]:
     try:
         client = await get_redis()
         if client is None:
             return None
 
-        value = await client.get(key)
+        pipe = client.pipeline(transaction=False)
+        pipe.get(key)
+        pipe.pttl(key)
+        value, ttl_ms = await pipe.execute()
+        record_redis_success()
         if value:
-            return json.loads(value)
+            metrics.incr("cache.l2.hit")
+            data = loads(value)
+            if settings.l1_cache_enabled:
+                _l1.set(key, data, l1_ttl(ttl_ms))
+            return data
+        metrics.incr("cache.l2.miss")
         return None
     except Exception as e:
+        record_redis_failure(e)
         logger.error(f"Cache get error for key {key}: {e}")
         return None
 
 
-async def cache_set(key: str, value: Any, ttl: int = 3600) -> bool:
+async def cache_set_raw(key: str, raw: str, ttl: int, loaded: Any) -> bool:
+    # Stores an already serialized value in Redis and its decoded form in the local tier
     try:
         client = await get_redis()
         if client is None:
             return False
 
+        await client.setex(key, ttl, raw)
+        record_redis_success()
+    except Exception as e:
+        record_redis_failure(e)
+        logger.error(f"Cache set error for key {key}: {e}")
+        return False
+
+    if settings.l1_cache_enabled:
+        _l1.set(key, loaded, l1_ttl(ttl * 1000))
+        await publish_invalidation(key=key)
+    return True
+
+
+async def cache_set(key: str, value: Any, ttl: int = 3600) -> bool:
+    try:
         json_value = json.dumps(value, ensure_ascii=False, default=str)
-        await client.setex(key, ttl, json_value)
-        return True
     except Exception as e:
         logger.error(f"Cache set error for key {key}: {e}")
         return False
 
+    return await cache_set_raw(key, json_value, ttl, json.loads(json_value))
+
+
+async def cache_get_many(keys: List[str], loads: Callable[[str], Any] = json.loads) -> Dict[str, Any]:
+    # Returns only the keys that were found. Everything the local tier cannot answer
+    # costs one round trip: MGET plus the PTTLs needed to bound the L1 copies.
+    found: Dict[str, Any] = {}
+    missing = []
+    for key in keys:
+        value = _l1.get(key) if settings.l1_cache_enabled else MISSING
+        if value is MISSING:
+            missing.append(key)
+        else:
+            found[key] = value
+    if settings.l1_cache_enabled:
+        metrics.incr("cache.l1.hit", len(found))
+        metrics.incr("cache.l1.miss", len(missing))
+    if not missing:
+        return found
+
+    try:
+        client = await get_redis()
+        if client is None:
+            return found
+
+        pipe = client.pipeline(transaction=False)
+        pipe.mget(missing)
+        if settings.l1_cache_enabled:
+            for key in missing:
+                pipe.pttl(key)
+        values, *ttls = await pipe.execute()
+        record_redis_success()
+    except Exception as e:
+        record_redis_failure(e)
+        logger.error(f"Cache get_many error for {len(missing)} keys: {e}")
+        return found
+
+    hits = 0
+    for index, (key, value) in enumerate(zip(missing, values)):
+        if not value:
+            continue
+        try:
+            data = loads(value)
+        except Exception as e:
+            logger.error(f"Cache get error for key {key}: {e}")
+            continue
+        hits += 1
+        found[key] = data
+        if settings.l1_cache_enabled:
+            _l1.set(key, data, l1_ttl(ttls[index]))
+    metrics.incr("cache.l2.hit", hits)
+    metrics.incr("cache.l2.miss", len(missing) - hits)
+    return found
+
+
+async def cache_set_many(entries: Iterable[Tuple[str, Any, int]]) -> bool:
+    # entries are (key, value, ttl) triples, written with pipelined SETEX in one round trip.
+    # Returns True only when every entry was written; values that fail to serialize are
+    # logged and skipped, the rest are still stored.
+    serialized = []
+    dropped = 0
+    for key, value, ttl in entries:
+        try:
+            serialized.append((key, json.dumps(value, ensure_ascii=False, default=str), ttl))
+        except Exception as e:
+            dropped += 1
+            logger.error(f"Cache set error for key {key}, not cached: {e}")
+    if not serialized:
+        return False
+
+    try:
+        client = await get_redis()
+        if client is None:
+            return False
+
+        pipe = client.pipeline(transaction=False)
+        for key, raw, ttl in serialized:
+            pipe.set(key, raw, ex=ttl)
+        await pipe.execute()
+        record_redis_success()
+    except Exception as e:
+        record_redis_failure(e)
+        logger.error(f"Cache set_many error for {len(serialized)} keys: {e}")
+        return False
+
+    if settings.l1_cache_enabled:
+        for key, raw, ttl in serialized:
+            _l1.set(key, json.loads(raw), l1_ttl(ttl * 1000))
+        await publish_invalidation(keys=[key for key, _, _ in serialized])
+    return dropped == 0
+
 
 async def cache_delete(key: str) -> bool:
+    _l1.delete(key)
     try:
         client = await get_redis()
         if client is None:
             return False
 
         await client.delete(key)
-        return True
     except Exception as e:
+        record_redis_failure(e)
         logger.error(f"Cache delete error for key {key}: {e}")
         return False
 
+    if settings.l1_cache_enabled:
+        await publish_invalidation(key=key)
+    return True
+
 
 async def cache_clear_pattern(pattern: str) -> int:
+    # Streams SCAN results and unlinks them chunk by chunk, so neither Redis nor this
+    # process ever holds the whole match set; UNLINK frees the values off the main thread
+    _l1.delete_pattern(pattern)
+    deleted = 0
     try:
         client = await get_redis()
         if client is None:
             return 0
 
-        keys = []
-        async for key in client.scan_iter(match=pattern):
-            keys.append(key)
+        chunk = []
+        async for key in client.scan_iter(match=pattern, count=CLEAR_BATCH_SIZE):
+            chunk.append(key)
+            if len(chunk) >= CLEAR_BATCH_SIZE:
+                deleted += await _unlink_chunk(client, chunk)
+                chunk = []
+        if chunk:
+            deleted += await _unlink_chunk(client, chunk)
+    except Exception as e:
+        record_redis_failure(e)
+        logger.error(f"Cache clear pattern error for {pattern} after {deleted} keys: {e}")
+        return deleted
+
+    if settings.l1_cache_enabled:
+        await publish_invalidation(pattern=pattern)
+    return deleted
+
+
+async def _unlink_chunk(client: redis.Redis, keys: List[str]) -> int:
+    pipe = client.pipeline(transaction=False)
+    for key in keys:
+        pipe.unlink(key)
+    return sum(await pipe.execute())
+
+
+# Namespaces: keys built with namespaced_key embed a generation counter, so bumping
+# the counter orphans every key of the namespace in O(1) and TTLs reclaim them later
+def generation_key(namespace: str) -> str:
+    return f"cache:gen:{namespace}"
+
+
+async def namespace_generation(namespace: str) -> Optional[int]:
+    # None when the counter can't be read. Guessing generation 0 could serve entries a
+    # bump already invalidated, so callers skip the cache instead.
+    key = generation_key(namespace)
+    if settings.l1_cache_enabled:
+        generation = _l1.get(key)
+        if generation is not MISSING:
+            return generation
+
+    try:
+        client = await get_redis()
+        if client is None:
+            return None
+
+        generation = int(await client.get(key) or 0)
+        record_redis_success()
+    except Exception as e:
+        record_redis_failure(e)
+        logger.error(f"Namespace generation read error for {namespace}: {e}")
+        return None
+
+    if settings.l1_cache_enabled:
+        _l1.set(key, generation, settings.l1_cache_max_ttl)
+    return generation
+
+
+async def namespaced_key(namespace: str, key: str) -> Optional[str]:
+    # None means "don't use the cache for this key right now"
+    generation = await namespace_generation(namespace)
+    if generation is None:
+        return None
+    return f"{namespace}:g{generation}:{key}"
+
+
+async def bump_namespace(namespace: str) -> Optional[int]:
+    key = generation_key(namespace)
+    _l1.delete(key)
+    try:
+        client = await get_redis()
+        if client is None:
+            return None
+
+        generation = await client.incr(key)
+    except Exception as e:
+        record_redis_failure(e)
+        logger.error(f"Namespace bump error for {namespace}: {e}")
+        return None
+
+    if settings.l1_cache_enabled:
+        # Other workers drop their cached generation; the old entries in their L1
+        # are keyed by the old generation and simply stop being read
+        await publish_invalidation(key=key)
+    return generation
+
+
+_RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
 
-        if keys:
-            return await client.delete(*keys)
-        return 0
+_EXTEND_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("expire", KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+
+async def acquire_lock(name: str, ttl: int = 60) -> Optional[str]:
+    # Returns a token when the lock was taken and None when another holder has it.
+    # Fails open: without Redis every caller gets a token so work still proceeds.
+    token = uuid.uuid4().hex
+    try:
+        client = await get_redis()
+        if client is None:
+            return token
+
+        acquired = await client.set(f"lock:{name}", token, nx=True, ex=ttl)
+        return token if acquired else None
+    except Exception as e:
+        record_redis_failure(e)
+        logger.error(f"Lock acquire error for {name}: {e}")
+        return token
+
+
+async def release_lock(name: str, token: str) -> bool:
+    try:
+        client = await get_redis()
+        if client is None:
+            return False
+
+        return bool(await client.eval(_RELEASE_LOCK_SCRIPT, 1, f"lock:{name}", token))
     except Exception as e:
-        logger.error(f"Cache clear pattern error for {pattern}: {e}")
-        return 0
+        record_redis_failure(e)
+        logger.error(f"Lock release error for {name}: {e}")
+        return False
+
+
+async def extend_lock(name: str, token: str, ttl: int) -> bool:
+    # Resets the TTL only while the lock is still ours
+    try:
+        client = await get_redis()
+        if client is None:
+            return False
+
+        return bool(await client.eval(_EXTEND_LOCK_SCRIPT, 1, f"lock:{name}", token, ttl))
+    except Exception as e:
+        record_redis_failure(e)
+        logger.error(f"Lock extend error for {name}: {e}")
+        return False
+
+
+async def keep_lock(name: str, token: str, ttl: int) -> None:
+    # Run as a task next to long work: renews the lock every third of its TTL so it
+    # can't expire mid-work, while a crashed holder still frees it within one TTL.
+    # Stops once the lock is lost; without Redis the lock failed open anyway.
+    while True:
+        await asyncio.sleep(ttl / 3)
+        if not await extend_lock(name, token, ttl):
+            logger.warning(f"Stopped renewing lock {name}, it is no longer held")
+            return
+
+
+async def wait_for_lock_release(name: str, timeout: float = 30.0, interval: float = 0.1) -> bool:
+    try:
+        client = await get_redis()
+        if client is None:
+            return True
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while await client.exists(f"lock:{name}"):
+            if loop.time() >= deadline:
+                return False
+            await asyncio.sleep(interval)
+        return True
+    except Exception as e:
+        record_redis_failure(e)
+        logger.error(f"Lock wait error for {name}: {e}")
+        return True
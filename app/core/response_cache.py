@@ -0,0 +1,107 @@
+import gzip
+import hashlib
+import json
+from typing import Any, Optional
+from fastapi import Request, Response
+from app.core import metrics
+from app.core.redis import cache_get, cache_set_raw
+
+GZIP_MIN_SIZE = 1024
+GZIP_LEVEL = 6
+
+
+# A response body serialized once, with its gzip variant and ETag, so cache hits
+# are written to the socket without touching json or the response model
+class CachedResponse:
+    __slots__ = ("body", "gzipped", "etag")
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self.gzipped = gzip.compress(body, GZIP_LEVEL) if len(body) >= GZIP_MIN_SIZE else None
+        self.etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def encode_body(payload: Any) -> str:
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def load_cached_response(raw: str) -> CachedResponse:
+    return CachedResponse(raw.encode("utf-8"))
+
+
+async def get_cached_response(key: str) -> Optional[CachedResponse]:
+    # Redis holds the JSON text (compatible with cache_get); the local tier holds the
+    # prepared bytes, so compression and hashing happen once per process per fill
+    return await cache_get(key, loads=load_cached_response)
+
+
+async def set_cached_response(key: str, payload: Any, ttl: Optional[int]) -> CachedResponse:
+    raw = encode_body(payload)
+    entry = load_cached_response(raw)
+    if ttl:
+        await cache_set_raw(key, raw, ttl, entry)
+    return entry
+
+
+def make_etag(*parts: Any) -> str:
+    # Strong validator derived from the data version instead of the body, so it can be
+    # checked before the payload is loaded
+    version = "|".join(str(part) for part in parts)
+    return f'"{hashlib.blake2b(version.encode("utf-8"), digest_size=16).hexdigest()}"'
+
+
+def gzip_etag(etag: str) -> str:
+    # Each content-coding is a different representation and needs its own strong tag
+    return f'{etag[:-1]}-gz"'
+
+
+def matching_etag(request: Request, etag: Optional[str]) -> Optional[str]:
+    # Returns the tag the client already holds (identity or gzip variant), if any
+    header = request.headers.get("if-none-match")
+    if not header or not etag:
+        return None
+    if header.strip() == "*":
+        return etag
+
+    # If-None-Match uses weak comparison, so W/ prefixes added by proxies still match
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    for tag in (etag, gzip_etag(etag)):
+        if tag in candidates:
+            return tag
+    return None
+
+
+def not_modified(etag: str, cache_control: Optional[str] = None) -> Response:
+    metrics.incr("response_cache.not_modified")
+    headers = {"ETag": etag, "Vary": "Accept-Encoding"}
+    if cache_control:
+        headers["Cache-Control"] = cache_control
+    return Response(status_code=304, headers=headers)
+
+
+def accepts_gzip(request: Request) -> bool:
+    return "gzip" in request.headers.get("accept-encoding", "").lower()
+
+
+def to_response(
+    request: Request,
+    entry: CachedResponse,
+    etag: Optional[str] = None,
+    cache_control: Optional[str] = None,
+) -> Response:
+    etag = etag or entry.etag
+    matched = matching_etag(request, etag)
+    if matched:
+        return not_modified(matched, cache_control)
+
+    headers = {"ETag": etag, "Vary": "Accept-Encoding"}
+    if cache_control:
+        headers["Cache-Control"] = cache_control
+
+    if entry.gzipped is not None and accepts_gzip(request):
+        metrics.incr("response_cache.gzip")
+        headers["ETag"] = gzip_etag(etag)
+        headers["Content-Encoding"] = "gzip"
+        return Response(entry.gzipped, media_type="application/json", headers=headers)
+
+    return Response(entry.body, media_type="application/json", headers=headers)
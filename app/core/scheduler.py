@@ -1,7 +1,11 @@
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
-from app.services.top_channels_service import update_top_channels
+from app.core.partitions import maintain_partitions
+from app.core.settings import settings
+from app.services.search_service import prefetch_trending
+from app.services.quota import Priority
+from app.services.top_channels_service import refresh_top_channels
 import logging
 
 logger = logging.getLogger(__name__)
@@ -10,15 +14,38 @@ scheduler = AsyncIOScheduler()
 
 def start_scheduler():
     scheduler.add_job(
-        update_top_channels,
+        refresh_top_channels,
         CronTrigger(day=1, hour=0, minute=1, timezone='Asia/Seoul'),
         id='update_top_channels',
         name='Update top channels monthly on 1st at 00:01 KST',
         replace_existing=True
     )
 
+    scheduler.add_job(
+        maintain_partitions,
+        CronTrigger(hour=0, minute=5, timezone='Asia/Seoul'),
+        id='maintain_partitions',
+        name='Create upcoming and drop expired history partitions daily at 00:05 KST',
+        replace_existing=True
+    )
+
+    if settings.trending_prefetch_enabled:
+        scheduler.add_job(
+            prefetch_trending,
+            CronTrigger(hour=settings.trending_prefetch_hour, minute=settings.trending_prefetch_minute),
+            # Scheduled work spends past the LOW budget that user-triggered fetches stop at
+            kwargs={'priority': Priority.NORMAL},
+            id='prefetch_trending',
+            name='Prefetch trending channels for configured regions daily',
+            replace_existing=True,
+            # A prefetch that started late is still worth running; a second one is not
+            misfire_grace_time=3600,
+            coalesce=True,
+            max_instances=1,
+        )
+
     scheduler.start()
-    logger.info("Scheduler started: Top channels will update monthly on 1st at 00:01 KST")
+    logger.info("Scheduler started: Top channels will update monthly on 1st at 00:01 KST, partitions are maintained daily")
 
 def shutdown_scheduler():
     if scheduler.running:
@@ -1,6 +1,7 @@
 
 import logging
 from fastapi import FastAPI
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 from pathlib import Path
@@ -10,6 +11,7 @@ from app.core.logging import setup_logging
 from app.api.endpoints import health as health_ep
 from app.api.endpoints import search as search_ep
 from app.api.endpoints import top_channels as top_channels_ep
+from app.api.endpoints import quota as quota_ep
 
 setup_logging("INFO")
 logger = logging.getLogger(__name__)
@@ -18,23 +20,43 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     from app.core.database import engine, Base
     from app.core.scheduler import start_scheduler, shutdown_scheduler
+    from app.core.http import init_http_client, close_http_client
+    from app.core.redis import close_redis, start_cache_invalidation_listener, stop_cache_invalidation_listener
+    from app.core.partitions import maintain_partitions
+    from app.services.warmup import start_warmup, stop_warmup
 
     logger.info("Creating database tables...")
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
     logger.info("Database tables created.")
+    # History tables only accept rows for months that have a partition
+    await maintain_partitions()
 
+    await init_http_client()
+    start_cache_invalidation_listener()
     start_scheduler()
+    start_warmup()
 
     yield
 
+    await stop_warmup()
     shutdown_scheduler()
+    await stop_cache_invalidation_listener()
+    await close_redis()
+    await close_http_client()
 
 app = FastAPI(title=settings.app_name, lifespan=lifespan)
+# Responses that already carry Content-Encoding (pre-compressed cache entries) pass through
+app.add_middleware(
+    GZipMiddleware,
+    minimum_size=settings.gzip_minimum_size,
+    compresslevel=settings.gzip_compresslevel,
+)
 
 app.include_router(health_ep.router)
 app.include_router(search_ep.router)
 app.include_router(top_channels_ep.router)
+app.include_router(quota_ep.router)
 
 static_path = Path(__file__).parent / "static"
 app.mount("/static", StaticFiles(directory=str(static_path)), name="static")
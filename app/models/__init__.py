@@ -1,4 +1,6 @@
-from app.models.top_channel import TopChannel
+from app.models.top_channel import TopChannel, TopChannelRefresh
 from app.models.search_result import SearchResult
+from app.models.channel import Channel, ChannelStatsSnapshot, TrendingAppearance
+from app.models.tracked_channel import TrackedChannel
 
-__all__ = ["TopChannel", "SearchResult"]
+__all__ = ["TopChannel", "TopChannelRefresh", "SearchResult", "Channel", "ChannelStatsSnapshot", "TrendingAppearance", "TrackedChannel"]
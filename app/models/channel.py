@@ -0,0 +1,49 @@
+from sqlalchemy import Column, String, BigInteger, Text, DateTime, Date, Integer, ForeignKey, Index
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+class Channel(Base):
+    __tablename__ = "channels"
+
+    channel_id = Column(String(255), primary_key=True)
+    title = Column(String(255), nullable=False)
+    description = Column(Text, nullable=True)
+    thumbnail_url = Column(String(500), nullable=True)
+    custom_url = Column(String(255), nullable=True)
+    country = Column(String(2), nullable=True)
+    published_at = Column(String(50), nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    # Last time the snippet was fetched by the top channels refresh; while it is recent
+    # the refresh asks YouTube for statistics only
+    last_fetched_at = Column(DateTime(timezone=True), nullable=True)
+
+
+class ChannelStatsSnapshot(Base):
+    __tablename__ = "channel_stats_snapshots"
+
+    channel_id = Column(String(255), ForeignKey("channels.channel_id"), primary_key=True)
+    captured_at = Column(DateTime(timezone=True), primary_key=True)
+    subscriber_count = Column(BigInteger, nullable=False)
+    video_count = Column(BigInteger, nullable=False)
+    view_count = Column(BigInteger, nullable=False)
+
+    __table_args__ = (
+        {"postgresql_partition_by": "RANGE (captured_at)"},
+    )
+
+
+class TrendingAppearance(Base):
+    __tablename__ = "trending_appearances"
+
+    region_code = Column(String(255), primary_key=True)
+    trending_date = Column(Date, primary_key=True)
+    max_results = Column(Integer, primary_key=True)
+    rank = Column(Integer, primary_key=True)
+    channel_id = Column(String(255), ForeignKey("channels.channel_id"), nullable=False)
+    video_appearances = Column(Integer, nullable=False, default=0)
+    captured_at = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        Index("ix_trending_appearances_channel_date", "channel_id", "trending_date"),
+        {"postgresql_partition_by": "RANGE (trending_date)"},
+    )
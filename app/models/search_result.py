@@ -1,14 +1,18 @@
-from sqlalchemy import Column, String, BigInteger, Text, DateTime, Date, Integer, JSON
+from sqlalchemy import Column, String, Text, DateTime, Date, Integer
 from sqlalchemy.sql import func
 from app.core.database import Base
 
 class SearchResult(Base):
     __tablename__ = "search_results"
 
-    id = Column(BigInteger, primary_key=True, autoincrement=True)
-    search_query = Column(String(255), nullable=False, index=True)
-    search_date = Column(Date, nullable=False, index=True)
-    max_results = Column(Integer, nullable=False)
+    search_query = Column(String(255), primary_key=True)
+    search_date = Column(Date, primary_key=True)
+    max_results = Column(Integer, primary_key=True)
     result_count = Column(Integer, nullable=False)
-    channels_data = Column(JSON, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Monthly partitions (app.core.partitions); the primary key serves the exact-day
+    # lookup and, scanned backwards, the latest-day fallback
+    __table_args__ = (
+        {"postgresql_partition_by": "RANGE (search_date)"},
+    )
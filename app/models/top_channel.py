@@ -7,7 +7,7 @@ class TopChannel(Base):
     __tablename__ = "top_channels"
 
     id = Column(BigInteger, primary_key=True, autoincrement=True)
-    country_code = Column(String(2), nullable=False, index=True)
+    country_code = Column(String(2), nullable=False)
     channel_id = Column(String(255), nullable=False)
     title = Column(String(255), nullable=False)
     description = Column(Text, nullable=True)
@@ -24,3 +24,12 @@ class TopChannel(Base):
     __table_args__ = (
         UniqueConstraint('country_code', 'rank', name='uq_country_rank'),
     )
+
+
+class TopChannelRefresh(Base):
+    __tablename__ = "top_channel_refreshes"
+
+    # Completed refreshes per country. Unchanged ranks are not rewritten, so the rows
+    # in top_channels no longer tell when the ranking was last checked.
+    country_code = Column(String(2), primary_key=True)
+    refreshed_at = Column(DateTime(timezone=True), nullable=False)
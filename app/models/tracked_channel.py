@@ -0,0 +1,18 @@
+from sqlalchemy import Column, String, Integer, DateTime, Index
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+class TrackedChannel(Base):
+    __tablename__ = "tracked_channels"
+
+    # Channels ranked by the top channels refresh. A channel may be tracked in several
+    # countries; higher priority channels are fetched first.
+    country_code = Column(String(2), primary_key=True)
+    channel_id = Column(String(255), primary_key=True)
+    priority = Column(Integer, nullable=False, default=0, server_default="0")
+    name = Column(String(255), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_tracked_channels_country_priority", "country_code", "priority", "channel_id"),
+    )
@@ -0,0 +1,57 @@
+import logging
+from typing import Any, Dict, Iterable, List
+from app.core import metrics
+from app.core.redis import cache_get_many, cache_set_many
+from app.core.settings import settings
+
+logger = logging.getLogger(__name__)
+
+SNIPPET_KEY_PREFIX = "channel:snippet"
+STATS_KEY_PREFIX = "channel:stats"
+
+
+def snippet_key(channel_id: str) -> str:
+    return f"{SNIPPET_KEY_PREFIX}:{channel_id}"
+
+
+def stats_key(channel_id: str) -> str:
+    return f"{STATS_KEY_PREFIX}:{channel_id}"
+
+
+def trim_snippet(snippet: Dict[str, Any]) -> Dict[str, Any]:
+    # Only the fields the API responses use; localized text and large thumbnails are dropped
+    return {
+        "title": snippet.get("title", ""),
+        "description": snippet.get("description", ""),
+        "thumbnails": {"default": {"url": snippet["thumbnails"]["default"]["url"]}},
+        "customUrl": snippet.get("customUrl", ""),
+        "country": snippet.get("country", ""),
+        "publishedAt": snippet.get("publishedAt", ""),
+    }
+
+
+async def get_cached_channels(channel_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    # Returns channels.list-shaped items for ids whose snippet and statistics are both cached
+    keys = [snippet_key(cid) for cid in channel_ids] + [stats_key(cid) for cid in channel_ids]
+    cached = await cache_get_many(keys)
+
+    items = {}
+    for channel_id in channel_ids:
+        snippet = cached.get(snippet_key(channel_id))
+        statistics = cached.get(stats_key(channel_id))
+        if snippet is not None and statistics is not None:
+            items[channel_id] = {"id": channel_id, "snippet": snippet, "statistics": statistics}
+
+    metrics.incr("channel_cache.hit", len(items))
+    metrics.incr("channel_cache.miss", len(channel_ids) - len(items))
+    return items
+
+
+async def cache_channels(items: Iterable[Dict[str, Any]]) -> None:
+    entries = []
+    for item in items:
+        channel_id = item["id"]
+        entries.append((snippet_key(channel_id), item["snippet"], settings.channel_snippet_ttl))
+        entries.append((stats_key(channel_id), item["statistics"], settings.channel_stats_ttl))
+    if entries:
+        await cache_set_many(entries)
@@ -97,27 +97,3 @@ CHANNEL_NAMES = {
         "Like Nastya Show",
     ],
 }
-
-CHANNEL_IDS = {
-    "KR": [
-        "UCOmHUn--16B90oW2L6FRR3A",
-        "UC3IZKseVpdzPSBaWxBxundA",
-        "UCaO6TYtlC8U5ttz62hTrZgg",
-        "UClRNDVO8093rmRTtLe4GEPw",
-        "UC-8B0Vn_3fe6D6H5saNcGKQ",
-    ],
-    "JP": [
-        "UC-lHJZR3Gqxm24_Vd_AJ5Yw",
-        "UCJFZiqLMntJufDCHc6bQixg",
-        "UCp-5t9SrOQwXMU7iIjQfARg",
-        "UC67Wr_9pA4I0glIxDt_Cpyw",
-        "UCpko_-a4wgz2u_DgDgd9fqA",
-    ],
-    "US": [
-        "UCX6OQ3DkcsbYNE6H8uQQuVA",
-        "UCbCmjCuTUZos6Inko4u57UQ",
-        "UCJplp5SjeGSdVdwsfb9Q7lQ",
-        "UCqECaJ8Gagnn7YCbPEzWH6g",
-        "UCBR8-60-B28hp2BmDPdntcQ",
-    ],
-}
@@ -0,0 +1,113 @@
+import csv
+import json
+import logging
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Optional
+from sqlalchemy import select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import async_session_maker
+from app.models.tracked_channel import TrackedChannel
+from app.services.youtube_client import CHANNEL_BATCH_SIZE
+
+logger = logging.getLogger(__name__)
+
+IMPORT_CHUNK_SIZE = 1000
+
+
+def tracked_channel_row(record: Dict[str, Any]) -> Dict[str, Any]:
+    channel_id = (record.get("channel_id") or "").strip()
+    country_code = (record.get("country_code") or "").strip().upper()
+    if not channel_id or len(country_code) != 2:
+        raise ValueError(f"channel_id and a two-letter country_code are required: {record}")
+
+    return {
+        "country_code": country_code,
+        "channel_id": channel_id,
+        "priority": int(record.get("priority") or 0),
+        "name": record.get("name") or None,
+    }
+
+
+def read_tracked_channels(path: Path) -> Iterator[Dict[str, Any]]:
+    # CSV with a header row (channel_id,country_code[,priority][,name]) or JSONL with
+    # the same keys, read lazily so large files are never loaded at once
+    with path.open(encoding="utf-8", newline="") as f:
+        if path.suffix.lower() == ".csv":
+            for record in csv.DictReader(f):
+                yield tracked_channel_row(record)
+            return
+
+        for line in f:
+            if line.strip():
+                yield tracked_channel_row(json.loads(line))
+
+
+async def upsert_tracked_channels(session: AsyncSession, rows: List[Dict[str, Any]]) -> None:
+    if not rows:
+        return
+
+    # A file may list a channel twice; the last entry wins
+    rows = list({(row["country_code"], row["channel_id"]): row for row in rows}.values())
+    stmt = pg_insert(TrackedChannel)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[TrackedChannel.country_code, TrackedChannel.channel_id],
+        set_={"priority": stmt.excluded.priority, "name": stmt.excluded.name},
+    )
+    await session.execute(stmt, rows)
+
+
+async def import_tracked_channels(records: Iterable[Dict[str, Any]], chunk_size: int = IMPORT_CHUNK_SIZE) -> int:
+    # One transaction for the whole file so a bad line leaves the registry untouched
+    imported = 0
+    async with async_session_maker() as session:
+        try:
+            chunk = []
+            for row in records:
+                chunk.append(row)
+                if len(chunk) >= chunk_size:
+                    await upsert_tracked_channels(session, chunk)
+                    imported += len(chunk)
+                    chunk = []
+            await upsert_tracked_channels(session, chunk)
+            imported += len(chunk)
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
+    return imported
+
+
+async def tracked_countries(session: AsyncSession) -> List[str]:
+    result = await session.execute(
+        select(TrackedChannel.country_code).distinct().order_by(TrackedChannel.country_code)
+    )
+    return list(result.scalars().all())
+
+
+async def tracked_channel_batches(
+    country_code: str,
+    batch_size: int = CHANNEL_BATCH_SIZE,
+) -> AsyncIterator[List[str]]:
+    # Keyset pages in (priority, channel_id) order, highest priority first. Each page is
+    # its own short query, so no connection is held while the caller fetches from YouTube.
+    last: Optional[tuple] = None
+    while True:
+        query = (
+            select(TrackedChannel.priority, TrackedChannel.channel_id)
+            .where(TrackedChannel.country_code == country_code)
+            .order_by(TrackedChannel.priority.desc(), TrackedChannel.channel_id.desc())
+            .limit(batch_size)
+        )
+        if last is not None:
+            query = query.where(tuple_(TrackedChannel.priority, TrackedChannel.channel_id) < last)
+
+        async with async_session_maker() as session:
+            rows = (await session.execute(query)).all()
+        if not rows:
+            return
+
+        yield [row.channel_id for row in rows]
+        if len(rows) < batch_size:
+            return
+        last = (rows[-1].priority, rows[-1].channel_id)
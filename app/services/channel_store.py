@@ -0,0 +1,84 @@
+from datetime import datetime
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.channel import Channel, ChannelStatsSnapshot
+
+CHANNEL_COLUMNS = ["title", "description", "thumbnail_url", "custom_url", "country", "published_at"]
+
+
+def channel_row(channel: dict) -> dict:
+    return {
+        "channel_id": channel["channelId"],
+        "title": channel["title"],
+        "description": channel["description"],
+        "thumbnail_url": channel["thumbnailUrl"],
+        "custom_url": channel.get("customUrl", ""),
+        "country": channel.get("country") or None,
+        "published_at": channel.get("publishedAt", ""),
+    }
+
+
+def snapshot_row(channel: dict, captured_at: datetime) -> dict:
+    return {
+        "channel_id": channel["channelId"],
+        "captured_at": captured_at,
+        "subscriber_count": channel["subscriberCount"],
+        "video_count": channel["videoCount"],
+        "view_count": channel["viewCount"],
+    }
+
+
+async def save_channel_snapshots(session: AsyncSession, channels: list, captured_at: datetime) -> None:
+    # Upserts the channel dimension rows and appends one statistics snapshot per channel
+    unique = list({channel["channelId"]: channel for channel in channels}.values())
+    if not unique:
+        return
+
+    stmt = pg_insert(Channel)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Channel.channel_id],
+        set_={
+            **{column: stmt.excluded[column] for column in CHANNEL_COLUMNS},
+            "updated_at": func.now(),
+        },
+    )
+    await session.execute(stmt, [channel_row(channel) for channel in unique])
+
+    await session.execute(
+        pg_insert(ChannelStatsSnapshot).on_conflict_do_nothing(),
+        [snapshot_row(channel, captured_at) for channel in unique],
+    )
+
+
+async def save_fetched_channels(session: AsyncSession, channels: list, fetched_at: datetime) -> None:
+    # Upserts freshly fetched snippets and stamps last_fetched_at; no statistics snapshot
+    unique = list({channel["channelId"]: channel for channel in channels}.values())
+    if not unique:
+        return
+
+    stmt = pg_insert(Channel)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Channel.channel_id],
+        set_={
+            **{column: stmt.excluded[column] for column in CHANNEL_COLUMNS},
+            "last_fetched_at": stmt.excluded.last_fetched_at,
+            "updated_at": func.now(),
+        },
+    )
+    await session.execute(stmt, [{**channel_row(channel), "last_fetched_at": fetched_at} for channel in unique])
+
+
+def channel_dict(channel: Channel, snapshot: ChannelStatsSnapshot) -> dict:
+    return {
+        "channelId": channel.channel_id,
+        "title": channel.title,
+        "description": channel.description,
+        "thumbnailUrl": channel.thumbnail_url,
+        "subscriberCount": snapshot.subscriber_count,
+        "videoCount": snapshot.video_count,
+        "viewCount": snapshot.view_count,
+        "customUrl": channel.custom_url,
+        "country": channel.country or "",
+        "publishedAt": channel.published_at,
+    }
@@ -0,0 +1,120 @@
+import logging
+from datetime import datetime
+from enum import IntEnum
+from typing import Any, Dict, Optional
+from zoneinfo import ZoneInfo
+from app.core import metrics
+from app.core.redis import get_redis, record_redis_failure
+from app.core.settings import settings
+
+logger = logging.getLogger(__name__)
+
+PACIFIC = ZoneInfo("America/Los_Angeles")
+QUOTA_KEY_PREFIX = "yt_quota"
+QUOTA_KEY_TTL = 2 * 86400
+TOTAL_FIELD = "_total"
+
+# Units charged per call, see https://developers.google.com/youtube/v3/determine_quota_cost
+QUOTA_COSTS = {
+    "search": 100,
+    "videos": 1,
+    "channels": 1,
+    "i18nRegions": 1,
+}
+
+
+class Priority(IntEnum):
+    LOW = 0
+    NORMAL = 1
+    HIGH = 2
+
+
+class QuotaExceededError(Exception):
+    pass
+
+
+class QuotaBudgetExceededError(QuotaExceededError):
+    pass
+
+
+def quota_cost(endpoint: str) -> int:
+    return QUOTA_COSTS.get(endpoint, 1)
+
+
+def quota_day(now: Optional[datetime] = None) -> str:
+    # YouTube quota days roll over at midnight Pacific time
+    now = (now or datetime.now(PACIFIC)).astimezone(PACIFIC)
+    return now.date().isoformat()
+
+
+def quota_key(day: Optional[str] = None) -> str:
+    return f"{QUOTA_KEY_PREFIX}:{day or quota_day()}"
+
+
+def quota_budget(priority: Priority) -> int:
+    return settings.youtube_quota_budgets.get(priority.name.lower(), settings.youtube_daily_quota)
+
+
+async def reserve_quota(endpoint: str, priority: Priority = Priority.NORMAL) -> None:
+    cost = quota_cost(endpoint)
+    budget = quota_budget(priority)
+
+    try:
+        client = await get_redis()
+        if client is None:
+            return
+
+        key = quota_key()
+        pipe = client.pipeline(transaction=True)
+        pipe.hincrby(key, TOTAL_FIELD, cost)
+        pipe.hincrby(key, endpoint, cost)
+        pipe.expire(key, QUOTA_KEY_TTL)
+        total, _, _ = await pipe.execute()
+    except Exception as e:
+        # The ledger fails open like the cache: an unreachable Redis never blocks API calls
+        record_redis_failure(e)
+        logger.error(f"Quota ledger error for {endpoint}: {e}")
+        return
+
+    if total > budget:
+        try:
+            pipe = client.pipeline(transaction=True)
+            pipe.hincrby(key, TOTAL_FIELD, -cost)
+            pipe.hincrby(key, endpoint, -cost)
+            await pipe.execute()
+        except Exception as e:
+            # The units stay charged, so let the call go ahead rather than defer it
+            record_redis_failure(e)
+            logger.error(f"Quota ledger rollback error for {endpoint}: {e}")
+            return
+
+        metrics.incr("youtube.quota_deferred")
+        metrics.incr(f"youtube.quota_deferred.{priority.name.lower()}")
+        raise QuotaBudgetExceededError(
+            f"{priority.name} budget of {budget} units used up, refusing {endpoint} ({cost} units)"
+        )
+
+
+async def get_quota_usage(day: Optional[str] = None) -> Dict[str, Any]:
+    day = day or quota_day()
+    by_endpoint: Dict[str, int] = {}
+
+    try:
+        client = await get_redis()
+        if client is not None:
+            raw = await client.hgetall(quota_key(day))
+            by_endpoint = {field: int(units) for field, units in raw.items()}
+    except Exception as e:
+        record_redis_failure(e)
+        logger.error(f"Quota ledger read error for {day}: {e}")
+
+    used = by_endpoint.pop(TOTAL_FIELD, 0)
+    return {
+        "date": day,
+        "timezone": "America/Los_Angeles",
+        "dailyLimit": settings.youtube_daily_quota,
+        "used": used,
+        "remaining": max(settings.youtube_daily_quota - used, 0),
+        "byEndpoint": by_endpoint,
+        "budgets": {p.name.lower(): quota_budget(p) for p in Priority},
+    }
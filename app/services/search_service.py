@@ -1,17 +1,69 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete, func
-from datetime import date, timedelta
+from sqlalchemy import select, and_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from datetime import date, datetime, timezone
 from app.models.search_result import SearchResult
-from app.services.youtube_client import get_trending_channels
+from app.models.channel import Channel, ChannelStatsSnapshot, TrendingAppearance
+from app.services.channel_store import save_channel_snapshots, channel_dict
+from app.services.youtube_client import get_i18n_regions, get_trending_channels
+from app.services.quota import Priority, QuotaExceededError
+from app.core.database import async_session_maker
+from app.core.settings import settings
+from app.core.redis import cache_get, cache_set, acquire_lock, keep_lock, release_lock, wait_for_lock_release
+from app.core.response_cache import CachedResponse, get_cached_response, set_cached_response
+from app.core.singleflight import SingleFlight
+import asyncio
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
+TRENDING_LOCK_TTL = 60
+TRENDING_CACHE_TTL = 86400
+# Largest max_results the endpoint accepts; the full ranked list is stored at this size
+TRENDING_FULL_SIZE = 50
+REGIONS_CACHE_KEY = "youtube_regions"
+REGIONS_CACHE_TTL = 86400
 
-async def get_trending_from_db(
+_trending_flight = SingleFlight("trending")
+
+
+async def load_trending_channels(
     session: AsyncSession,
     region_code: str,
+    trending_date: date,
     max_results: int
+) -> list:
+    result = await session.execute(
+        select(TrendingAppearance, Channel, ChannelStatsSnapshot)
+        .join(Channel, Channel.channel_id == TrendingAppearance.channel_id)
+        .join(
+            ChannelStatsSnapshot,
+            and_(
+                ChannelStatsSnapshot.channel_id == TrendingAppearance.channel_id,
+                ChannelStatsSnapshot.captured_at == TrendingAppearance.captured_at
+            )
+        )
+        .where(
+            TrendingAppearance.region_code == region_code,
+            TrendingAppearance.trending_date == trending_date,
+            TrendingAppearance.max_results == max_results
+        )
+        .order_by(TrendingAppearance.rank)
+    )
+
+    channels = []
+    for appearance, channel, snapshot in result.all():
+        channels.append({
+            **channel_dict(channel, snapshot),
+            "videoAppearances": appearance.video_appearances,
+        })
+    return channels
+
+
+async def get_trending_from_db(
+    session: AsyncSession,
+    region_code: str
 ) -> dict | None:
     today = date.today()
 
@@ -20,17 +72,45 @@ async def get_trending_from_db(
         .where(
             SearchResult.search_query == region_code,
             SearchResult.search_date == today,
-            SearchResult.max_results == max_results
+            SearchResult.max_results == TRENDING_FULL_SIZE
         )
     )
     search_result = result.scalar_one_or_none()
 
     if search_result:
         logger.info(f"Found cached trending channels for region: {region_code}")
+        channels = await load_trending_channels(session, region_code, today, TRENDING_FULL_SIZE)
         return {
             "regionCode": region_code,
             "result_count": search_result.result_count,
-            "channels": search_result.channels_data,
+            "channels": channels,
+        }
+
+    return None
+
+
+async def get_latest_trending_from_db(
+    session: AsyncSession,
+    region_code: str
+) -> dict | None:
+    result = await session.execute(
+        select(SearchResult)
+        .where(SearchResult.search_query == region_code)
+        .order_by(SearchResult.search_date.desc(), SearchResult.max_results.desc())
+        .limit(1)
+    )
+    search_result = result.scalar_one_or_none()
+
+    if search_result:
+        channels = await load_trending_channels(
+            session, region_code, search_result.search_date, search_result.max_results
+        )
+        return {
+            "regionCode": region_code,
+            "result_count": search_result.result_count,
+            "channels": channels,
+            "stale": True,
+            "searchDate": search_result.search_date.isoformat(),
         }
 
     return None
@@ -39,54 +119,201 @@ async def get_trending_from_db(
 async def save_trending_to_db(
     session: AsyncSession,
     region_code: str,
-    max_results: int,
     channels: list
 ):
+    # Old history is dropped by partition retention (app.core.partitions), not here
     today = date.today()
-    thirty_days_ago = today - timedelta(days=30)
+    captured_at = datetime.now(timezone.utc)
 
-    await session.execute(
-        delete(SearchResult).where(SearchResult.search_date < thirty_days_ago)
-    )
+    await save_channel_snapshots(session, channels, captured_at)
+
+    if channels:
+        await session.execute(
+            pg_insert(TrendingAppearance).on_conflict_do_nothing(),
+            [
+                {
+                    "region_code": region_code,
+                    "trending_date": today,
+                    "max_results": TRENDING_FULL_SIZE,
+                    "rank": rank,
+                    "channel_id": channel["channelId"],
+                    "video_appearances": channel.get("videoAppearances", 0),
+                    "captured_at": captured_at,
+                }
+                for rank, channel in enumerate(channels, start=1)
+            ],
+        )
 
-    search_result = SearchResult(
-        search_query=region_code,
-        search_date=today,
-        max_results=max_results,
-        result_count=len(channels),
-        channels_data=channels
+    await session.execute(
+        pg_insert(SearchResult)
+        .values(
+            search_query=region_code,
+            search_date=today,
+            max_results=TRENDING_FULL_SIZE,
+            result_count=len(channels),
+        )
+        .on_conflict_do_nothing(index_elements=["search_query", "search_date", "max_results"])
     )
-    session.add(search_result)
     await session.commit()
 
     logger.info(f"Saved trending channels to DB for region: {region_code}")
 
 
+def trending_cache_key(region_code: str, day: date) -> str:
+    return f"trending:{region_code}:{day.isoformat()}"
+
+
+def slice_trending(result: dict, max_results: int) -> dict:
+    channels = result["channels"][:max_results]
+    return {**result, "result_count": len(channels), "channels": channels}
+
+
+async def trending_fallback(session: AsyncSession, region_code: str) -> dict:
+    # Last stored list when today's can't be fetched
+    stale_result = await get_latest_trending_from_db(session, region_code)
+    if stale_result:
+        return stale_result
+    return {
+        "regionCode": region_code,
+        "result_count": 0,
+        "channels": [],
+        "error": "API 할당량 초과. 잠시 후 다시 시도해주세요."
+    }
+
+
+async def fetch_and_save_trending(region_code: str, priority: Priority = Priority.LOW) -> dict:
+    # Runs once per (region, day) across the process via the single-flight group, and
+    # across workers via a Redis lock, with its own session so it outlives the request
+    # that started it.
+    today = date.today()
+    lock_name = f"trending:{region_code}:{today.isoformat()}"
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + TRENDING_LOCK_TTL
+    token = await acquire_lock(lock_name, ttl=TRENDING_LOCK_TTL)
+    while token is None:
+        # Another worker is fetching: use what it stored, and only fetch upstream
+        # ourselves once we hold the lock
+        logger.info(f"Waiting for another worker to fetch trending channels for {region_code}")
+        await wait_for_lock_release(lock_name, timeout=max(deadline - loop.time(), 0))
+        async with async_session_maker() as session:
+            fetched_result = await get_trending_from_db(session, region_code)
+            if fetched_result:
+                return fetched_result
+            if loop.time() >= deadline:
+                logger.warning(f"Gave up waiting for the trending fetch lock for {region_code}")
+                return await trending_fallback(session, region_code)
+        token = await acquire_lock(lock_name, ttl=TRENDING_LOCK_TTL)
+
+    # Pages retried with backoff (and Retry-After) can outlast the TTL; renewing keeps a
+    # second worker from taking the lock and spending quota on the same fetch
+    renewal = asyncio.create_task(keep_lock(lock_name, token, TRENDING_LOCK_TTL))
+    try:
+        async with async_session_maker() as session:
+            cached_result = await get_trending_from_db(session, region_code)
+            if cached_result:
+                return cached_result
+
+            try:
+                # The upstream cost is the same 3 pages for any max_results, so the full
+                # ranked list is fetched and stored once and every request slices it
+                result = await get_trending_channels(
+                    region_code=region_code, max_results=TRENDING_FULL_SIZE, priority=priority
+                )
+                channels = result["channels"]
+
+                await save_trending_to_db(session, region_code, channels)
+
+                full_result = {
+                    "regionCode": region_code,
+                    "result_count": len(channels),
+                    "channels": channels,
+                }
+                await cache_set(trending_cache_key(region_code, today), full_result, ttl=TRENDING_CACHE_TTL)
+                return full_result
+            except QuotaExceededError as e:
+                logger.warning(f"Trending fetch deferred for region {region_code}: {e}")
+                return await trending_fallback(session, region_code)
+            except Exception as e:
+                logger.error(f"Trending API call failed: {e}")
+                return {
+                    "regionCode": region_code,
+                    "result_count": 0,
+                    "channels": [],
+                    "error": "API 할당량 초과. 잠시 후 다시 시도해주세요."
+                }
+    finally:
+        renewal.cancel()
+        await release_lock(lock_name, token)
+
+
+async def get_full_trending(
+    session: AsyncSession,
+    region_code: str,
+    priority: Priority = Priority.LOW,
+) -> dict:
+    today = date.today()
+    cache_key = trending_cache_key(region_code, today)
+
+    cached_result = await cache_get(cache_key)
+    if cached_result:
+        return cached_result
+
+    db_result = await get_trending_from_db(session, region_code)
+    if db_result:
+        await cache_set(cache_key, db_result, ttl=TRENDING_CACHE_TTL)
+        return db_result
+
+    return await _trending_flight.do(
+        (region_code, today), lambda: fetch_and_save_trending(region_code, priority)
+    )
+
+
+async def prefetch_trending(priority: Priority = Priority.NORMAL) -> None:
+    # Materializes today's trending lists ahead of users. Regions start evenly spaced
+    # across the spread window so quota use is smoothed out; each one goes through
+    # get_full_trending, so it shares a fetch with any request that misses meanwhile.
+    regions = settings.trending_regions
+    if not regions:
+        return
+
+    interval = settings.trending_prefetch_spread_seconds / len(regions)
+    started = time.perf_counter()
+    fetched = 0
+
+    for index, region_code in enumerate(regions):
+        if index:
+            await asyncio.sleep(interval)
+
+        try:
+            async with async_session_maker() as session:
+                result = await get_full_trending(session, region_code, priority)
+            if result.get("error") or result.get("stale"):
+                logger.warning(f"Trending prefetch for {region_code} got no fresh data")
+            else:
+                fetched += 1
+        except Exception as e:
+            logger.error(f"Trending prefetch failed for {region_code}: {e}")
+
+    logger.info(
+        f"Trending prefetch finished: {fetched}/{len(regions)} regions in {time.perf_counter() - started:.1f}s"
+    )
+
+
 async def get_trending_channels_with_cache(
     session: AsyncSession,
     region_code: str = "KR",
     max_results: int = 50,
 ) -> dict:
-    cached_result = await get_trending_from_db(session, region_code, max_results)
-    if cached_result:
-        return cached_result
+    result = await get_full_trending(session, region_code)
+    return slice_trending(result, max_results)
 
-    try:
-        result = await get_trending_channels(region_code=region_code, max_results=max_results)
-        channels = result["channels"]
 
-        await save_trending_to_db(session, region_code, max_results, channels)
+async def get_regions_response() -> CachedResponse:
+    cached_regions = await get_cached_response(REGIONS_CACHE_KEY)
+    if cached_regions is not None:
+        logger.info("Returning regions from cache")
+        return cached_regions
 
-        return {
-            "regionCode": region_code,
-            "result_count": len(channels),
-            "channels": channels,
-        }
-    except Exception as e:
-        logger.error(f"Trending API call failed: {e}")
-        return {
-            "regionCode": region_code,
-            "result_count": 0,
-            "channels": [],
-            "error": "API 할당량 초과. 잠시 후 다시 시도해주세요."
-        }
+    regions = await get_i18n_regions()
+    return await set_cached_response(REGIONS_CACHE_KEY, regions, ttl=REGIONS_CACHE_TTL)
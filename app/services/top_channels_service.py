@@ -1,126 +1,395 @@
 
 import asyncio
-from sqlalchemy import delete
+import heapq
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.services.youtube_client import get_channels_by_ids, get_channels_by_names
-from app.services.channel_names import CHANNEL_IDS, CHANNEL_NAMES
-from app.models.top_channel import TopChannel
+from app.services.youtube_client import get_channel_statistics, get_channels_by_ids, get_channels_by_names
+from app.services.quota import Priority
+from app.services.channel_names import CHANNEL_NAMES
+from app.services.channel_registry import tracked_channel_batches, tracked_countries
+from app.services.channel_store import save_fetched_channels
+from app.models.channel import Channel
+from app.models.top_channel import TopChannel, TopChannelRefresh
 from app.core.database import async_session_maker
-from app.core.redis import cache_get, cache_set
+from app.core.settings import settings
+from app.core.redis import cache_get, cache_set, cache_delete, acquire_lock, release_lock
+from app.core.response_cache import CachedResponse, get_cached_response, set_cached_response, make_etag
+from datetime import datetime, timezone, timedelta
+from typing import Any, Dict, List, Mapping, Optional
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
-COUNTRIES = ["KR", "JP", "US"]
+COUNTRIES = settings.top_channel_countries
 CACHE_TTL = 86400
+STALE_CACHE_TTL = 60
+REFRESH_LOCK_NAME = "top_channels_refresh"
+REFRESH_LOCK_TTL = 600
+# Registry pages (of CHANNEL_BATCH_SIZE ids) being fetched at once per country
+TRACKED_BATCH_CONCURRENCY = 4
 
-async def update_top_channels():
-    from sqlalchemy import func
-    from datetime import date, timedelta, datetime
+UPSERT_COLUMNS = [
+    "channel_id", "title", "description", "thumbnail_url", "subscriber_count",
+    "video_count", "view_count", "custom_url", "published_at",
+]
 
-    logger.info("Starting top channels update...")
+_refresh_task: Optional[asyncio.Task] = None
+# Monotonic time of the last failed refresh in this process. The Redis lock is what
+# spaces out retries across workers, but it fails open without Redis.
+_last_failure: Optional[float] = None
+
+def top_channel_rows(country_code: str, channels: list) -> list[dict]:
+    return [
+        {
+            "country_code": country_code,
+            "channel_id": channel["channelId"],
+            "title": channel["title"],
+            "description": channel["description"],
+            "thumbnail_url": channel["thumbnailUrl"],
+            "subscriber_count": channel["subscriberCount"],
+            "video_count": channel["videoCount"],
+            "view_count": channel["viewCount"],
+            "custom_url": channel.get("customUrl", ""),
+            "published_at": channel.get("publishedAt", ""),
+            "rank": rank,
+        }
+        for rank, channel in enumerate(channels, start=1)
+    ]
+
+
+def changed_top_channel_rows(current: Dict[int, Mapping[str, Any]], rows: List[dict]) -> List[dict]:
+    # current maps rank to the stored row; a rank is written when it is new or any
+    # upserted column differs
+    return [
+        row for row in rows
+        if row["rank"] not in current
+        or any(current[row["rank"]][column] != row[column] for column in UPSERT_COLUMNS)
+    ]
+
+
+async def upsert_country_channels(session: AsyncSession, country_code: str, channels: list) -> int:
+    # Replaces a country's ranking in the caller's transaction: changed ranks are upserted
+    # in place on uq_country_rank and ranks past the new list are trimmed, so readers see
+    # either the old or the new ranking but never an empty country. Ranks whose channel,
+    # counts and snippet are unchanged are not written at all. Returns the rows written.
+    rows = top_channel_rows(country_code, channels)
+
+    result = await session.execute(
+        select(TopChannel.rank, *[getattr(TopChannel, column) for column in UPSERT_COLUMNS])
+        .where(TopChannel.country_code == country_code)
+    )
+    current = {row.rank: row._mapping for row in result}
+    changed = changed_top_channel_rows(current, rows)
+
+    if changed:
+        # executemany form: SQLAlchemy batches it into cached multi-row VALUES statements
+        stmt = pg_insert(TopChannel)
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_country_rank",
+            set_={
+                **{column: stmt.excluded[column] for column in UPSERT_COLUMNS},
+                "updated_at": func.now(),
+            },
+        )
+        await session.execute(stmt, changed)
+
+    if len(current) > len(rows):
+        await session.execute(
+            delete(TopChannel).where(
+                TopChannel.country_code == country_code,
+                TopChannel.rank > len(rows),
+            )
+        )
+    return len(changed)
+
+
+async def mark_country_refreshed(session: AsyncSession, country_code: str) -> None:
+    stmt = pg_insert(TopChannelRefresh).values(country_code=country_code, refreshed_at=func.now())
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[TopChannelRefresh.country_code],
+        set_={"refreshed_at": func.now()},
+    )
+    await session.execute(stmt)
+
+
+async def fetch_channels_incremental(channel_ids: List[str]) -> tuple[list, list]:
+    # Full snippet+statistics fetch only for channels whose stored snippet is missing or
+    # older than top_channel_snippet_max_age; the rest get statistics only and reuse the
+    # snippet in the channels table. Returns (channels, channels fetched in full).
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=settings.top_channel_snippet_max_age)
 
     async with async_session_maker() as session:
+        result = await session.execute(select(Channel).where(Channel.channel_id.in_(channel_ids)))
+        known: Dict[str, Channel] = {channel.channel_id: channel for channel in result.scalars()}
+
+    fresh = [
+        cid for cid in channel_ids
+        if cid in known and known[cid].last_fetched_at is not None and known[cid].last_fetched_at >= cutoff
+    ]
+    fresh_ids = set(fresh)
+    stale = [cid for cid in channel_ids if cid not in fresh_ids]
+
+    # The full fetch skips the channel cache: its snippets get stamped last_fetched_at,
+    # which must mean they came from YouTube now
+    full, statistics = await asyncio.gather(
+        get_channels_by_ids(stale, priority=Priority.HIGH, use_cache=False),
+        get_channel_statistics(fresh, priority=Priority.HIGH),
+    )
+
+    channels = list(full)
+    for cid in fresh:
+        if cid not in statistics:
+            continue
+        channel = known[cid]
+        channels.append({
+            "channelId": cid,
+            "title": channel.title,
+            "description": channel.description,
+            "thumbnailUrl": channel.thumbnail_url,
+            **statistics[cid],
+            "customUrl": channel.custom_url or "",
+            "country": channel.country or "",
+            "publishedAt": channel.published_at or "",
+        })
+
+    return channels, full
+
+
+async def save_snippets(channels: list) -> None:
+    # Snippets fetched in full are stored as soon as their page is done, so they don't
+    # have to be held until the whole registry has been walked
+    if not channels:
+        return
+    async with async_session_maker() as session:
+        await save_fetched_channels(session, channels, datetime.now(timezone.utc))
+        await session.commit()
+
+
+async def fetch_country_channels(country_code: str) -> list:
+    # Returns the country's top_channels_per_country channels, best first. Registry pages
+    # of 50 ids are fetched as they are read, a few pages in flight, and merged into a
+    # bounded min-heap so memory stays flat however many channels are tracked.
+    limit = settings.top_channels_per_country
+    semaphore = asyncio.Semaphore(TRACKED_BATCH_CONCURRENCY)
+    top: List[tuple] = []
+    counts = {"tracked": 0, "full": 0}
+
+    async def fetch_batch(channel_ids):
         try:
-            thirty_days_ago = datetime.now() - timedelta(days=30)
+            channels, full = await fetch_channels_incremental(channel_ids)
+            await save_snippets(full)
+        finally:
+            semaphore.release()
 
-            await session.execute(
-                delete(TopChannel).where(TopChannel.created_at < thirty_days_ago)
-            )
-            await session.flush()
-            logger.info("Cleaned up data older than 30 days")
-
-            for country_code in COUNTRIES:
-                logger.info(f"Fetching top channels for {country_code}...")
-
-                channel_ids = CHANNEL_IDS.get(country_code, [])
-
-                if channel_ids:
-                    logger.info(f"Using {len(channel_ids)} channel IDs for {country_code}")
-                    try:
-                        channels = await get_channels_by_ids(channel_ids)
-                    except Exception as e:
-                        logger.error(f"Failed to get channels by IDs for {country_code}: {e}")
-                        channels = []
-                else:
-                    logger.warning(f"No channel IDs found for {country_code}, falling back to name search (expensive!)")
-                    logger.warning(f"Please run scripts/collect_channel_ids.py to populate channel IDs")
-                    channel_names = CHANNEL_NAMES.get(country_code, [])
-                    try:
-                        channels = await get_channels_by_names(channel_names)
-                    except Exception as e:
-                        logger.error(f"Failed to get channels by names for {country_code}: {e}")
-                        channels = []
-
-                if not channels:
-                    logger.warning(f"No channels retrieved for {country_code}, skipping save")
-                    continue
-
-                await session.execute(
-                    delete(TopChannel).where(TopChannel.country_code == country_code)
-                )
-                await session.commit()
-                logger.info(f"Cleared all existing data for {country_code}")
-
-                for rank, channel in enumerate(channels, start=1):
-                    top_channel = TopChannel(
-                        country_code=country_code,
-                        channel_id=channel["channelId"],
-                        title=channel["title"],
-                        description=channel["description"],
-                        thumbnail_url=channel["thumbnailUrl"],
-                        subscriber_count=channel["subscriberCount"],
-                        video_count=channel["videoCount"],
-                        view_count=channel["viewCount"],
-                        custom_url=channel.get("customUrl", ""),
-                        published_at=channel.get("publishedAt", ""),
-                        rank=rank
-                    )
-                    session.add(top_channel)
+        counts["tracked"] += len(channels)
+        counts["full"] += len(full)
+        for channel in channels:
+            entry = (channel["subscriberCount"], channel["channelId"], channel)
+            if len(top) < limit:
+                heapq.heappush(top, entry)
+            elif entry[:2] > top[0][:2]:
+                heapq.heapreplace(top, entry)
+
+    tasks = []
+    try:
+        async for channel_ids in tracked_channel_batches(country_code):
+            await semaphore.acquire()
+            tasks.append(asyncio.create_task(fetch_batch(channel_ids)))
+        await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+
+    if tasks:
+        logger.info(
+            f"Fetched {counts['tracked']} tracked channels for {country_code} "
+            f"({counts['full']} in full, the rest statistics only), keeping the top {len(top)}"
+        )
+        return [channel for _, _, channel in sorted(top, key=lambda entry: entry[:2], reverse=True)]
+
+    logger.warning(f"No tracked channels for {country_code}, falling back to name search (expensive!)")
+    logger.warning(f"Please import channel IDs with scripts/import_tracked_channels.py")
+    channels = await get_channels_by_names(CHANNEL_NAMES.get(country_code, []))
+    await save_snippets(channels)
+    return heapq.nlargest(limit, channels, key=lambda channel: channel["subscriberCount"])
+
+
+async def refresh_country(country_code: str, semaphore: asyncio.Semaphore) -> int:
+    # Each country fetches and commits on its own so a failing region never rolls back
+    # or delays the others
+    async with semaphore:
+        logger.info(f"Fetching top channels for {country_code}...")
+        started = time.perf_counter()
+
+        channels = await fetch_country_channels(country_code)
+        fetched = time.perf_counter()
+
+        if not channels:
+            # Not marked refreshed, so the country stays stale and is retried after the cooldown
+            raise RuntimeError(f"No channels retrieved for {country_code}")
+
+        async with async_session_maker() as session:
+            try:
+                written = await upsert_country_channels(session, country_code, channels)
+                await mark_country_refreshed(session, country_code)
                 await session.commit()
+            except Exception:
+                await session.rollback()
+                raise
+
+        finished = time.perf_counter()
+        logger.info(
+            f"Refreshed {len(channels)} channels for {country_code}, wrote {written} changed ranks "
+            f"in {finished - started:.2f}s (fetch {fetched - started:.2f}s, write {finished - fetched:.2f}s)"
+        )
+        return written
+
 
-                logger.info(f"Saved {len(channels)} channels for {country_code}")
+async def expected_countries(session: AsyncSession) -> List[str]:
+    # Every country in the registry is ranked; the configured list only covers a registry
+    # that hasn't been imported yet (the name-search fallback)
+    return await tracked_countries(session) or list(COUNTRIES)
 
-            logger.info("Top channels update completed successfully!")
 
-        except Exception as e:
-            logger.error(f"Error updating top channels: {e}")
-            await session.rollback()
-            raise
+async def stale_countries(session: AsyncSession, countries: List[str]) -> List[str]:
+    # A country is fresh only once it has been refreshed this month, so one that failed
+    # or came back empty keeps being retried instead of riding on the others
+    _, month_start_utc = current_month_kst()
+    result = await session.execute(select(TopChannelRefresh.country_code, TopChannelRefresh.refreshed_at))
+    refreshed = {row.country_code: row.refreshed_at for row in result.all()}
+    return [
+        country for country in countries
+        if refreshed.get(country) is None or refreshed[country] < month_start_utc
+    ]
+
+
+async def update_top_channels(countries: Optional[List[str]] = None) -> List[str]:
+    # Refreshes the given countries (every expected one by default) and returns the
+    # ones that failed; raises only when all of them did
+    logger.info("Starting top channels update...")
+    started = time.perf_counter()
+
+    if countries is None:
+        async with async_session_maker() as session:
+            countries = await expected_countries(session)
+    semaphore = asyncio.Semaphore(settings.top_channels_refresh_concurrency)
+    results = await asyncio.gather(
+        *[refresh_country(country_code, semaphore) for country_code in countries],
+        return_exceptions=True,
+    )
 
+    failed = []
+    for country_code, result in zip(countries, results):
+        if isinstance(result, Exception):
+            logger.error(f"Error updating top channels for {country_code}: {result}")
+            failed.append(country_code)
 
-async def get_top_channels_from_db(session: AsyncSession) -> dict:
-    from sqlalchemy import select
-    from datetime import datetime, date, timezone, timedelta
-    from app.core.redis import cache_delete
+    month_key, _ = current_month_kst()
+    await cache_delete(top_channels_version_key(month_key))
+    await cache_delete(top_channels_cache_key(month_key))
+    # Post-refresh hook: rebuild the cached ranking now rather than on the next request
+    await warm_top_channels_cache()
 
+    elapsed = time.perf_counter() - started
+    if failed and len(failed) == len(countries):
+        raise RuntimeError(f"Top channels update failed for every country ({elapsed:.2f}s)")
+    if failed:
+        logger.warning(f"Top channels update finished in {elapsed:.2f}s, failed: {', '.join(failed)}")
+    else:
+        logger.info(f"Top channels update completed successfully in {elapsed:.2f}s!")
+    return failed
+
+
+def current_month_kst() -> tuple[str, datetime]:
     kst = timezone(timedelta(hours=9))
     now_kst = datetime.now(kst)
 
-    cache_key = f"top_channels:{now_kst.year}-{now_kst.month:02d}"
-    cached_data = await cache_get(cache_key)
-    if cached_data:
-        total_channels = sum(len(cached_data.get(country, [])) for country in ["KR", "JP", "US"])
-        if total_channels == 0:
-            logger.warning("Cache has empty data, deleting cache")
-            await cache_delete(cache_key)
-        else:
-            logger.info("Returning top channels from cache")
-            return cached_data
-
     month_start_kst = datetime(now_kst.year, now_kst.month, 1, 0, 0, 0, tzinfo=kst)
-    month_start_utc = month_start_kst.astimezone(timezone.utc)
+    return f"{now_kst.year}-{now_kst.month:02d}", month_start_kst.astimezone(timezone.utc)
+
+
+async def refresh_top_channels(countries: Optional[List[str]] = None):
+    # The lock keeps a refresh to one worker at a time. After a failure, even of a single
+    # country, it is left to expire so that stale reads don't retry against an exhausted
+    # quota every request.
+    global _last_failure
+
+    token = await acquire_lock(REFRESH_LOCK_NAME, ttl=REFRESH_LOCK_TTL)
+    if token is None:
+        logger.info("Top channels refresh already running on another worker")
+        return
+
+    try:
+        failed = await update_top_channels(countries)
+    except Exception as e:
+        _last_failure = time.monotonic()
+        logger.error(f"Background top channels refresh failed, retrying after {REFRESH_LOCK_TTL}s: {e}")
+        return
+
+    if failed:
+        _last_failure = time.monotonic()
+        logger.warning(f"Retrying top channels for {', '.join(failed)} after {REFRESH_LOCK_TTL}s")
+        return
+
+    _last_failure = None
+    await release_lock(REFRESH_LOCK_NAME, token)
 
+
+def schedule_top_channels_refresh(countries: Optional[List[str]] = None) -> bool:
+    global _refresh_task
+
+    if _refresh_task is not None and not _refresh_task.done():
+        return False
+    if _last_failure is not None and time.monotonic() - _last_failure < REFRESH_LOCK_TTL:
+        return False
+
+    _refresh_task = asyncio.create_task(refresh_top_channels(countries))
+    logger.info(f"Scheduled background top channels refresh for {', '.join(countries) if countries else 'all countries'}")
+    return True
+
+
+def top_channels_cache_key(month_key: str) -> str:
+    return f"top_channels:{month_key}"
+
+
+def top_channels_version_key(month_key: str) -> str:
+    return f"top_channels:version:{month_key}"
+
+
+async def get_top_channels_etag() -> Optional[str]:
+    # Small version entry (when the ranking last changed) written next to the payload, so a
+    # conditional request can be answered without loading the ranking
+    month_key, _ = current_month_kst()
+    version = await cache_get(top_channels_version_key(month_key))
+    if not version:
+        return None
+    return make_etag("top-channels", month_key, version)
+
+
+async def load_top_channels(
+    session: AsyncSession,
+    schedule_refresh: bool = True,
+) -> tuple[dict, Optional[int], Optional[str]]:
+    # Returns the grouped ranking, how long it may be cached (None: don't cache) and
+    # its version, the time the ranking last changed
+    month_key, _ = current_month_kst()
+    countries = await expected_countries(session)
+
+    # Serve the last known ranking right away, even when it is from a previous month,
+    # and let a background refresh replace it
     result = await session.execute(
         select(TopChannel)
-        .where(TopChannel.created_at >= month_start_utc)
+        .where(TopChannel.rank <= settings.top_channels_per_country)
         .order_by(TopChannel.country_code, TopChannel.rank)
     )
     channels = result.scalars().all()
 
-    grouped = {"KR": [], "JP": [], "US": []}
+    grouped = {country: [] for country in countries}
     for channel in channels:
-        grouped[channel.country_code].append({
+        grouped.setdefault(channel.country_code, []).append({
             "rank": channel.rank,
             "channelId": channel.channel_id,
             "title": channel.title,
@@ -134,25 +403,50 @@ async def get_top_channels_from_db(session: AsyncSession) -> dict:
             "updatedAt": channel.updated_at.isoformat() if channel.updated_at else None,
         })
 
-    await cache_set(cache_key, grouped, ttl=CACHE_TTL)
-    logger.info("Cached top channels data")
+    # Only changed ranks are written, so the newest updated_at is when the ranking last
+    # changed; the row count covers ranks trimmed without any other change
+    changed_at = max(
+        (channel.updated_at for channel in channels if channel.updated_at is not None),
+        default=None,
+    )
+    version = f"{changed_at.isoformat()}/{len(channels)}" if changed_at else None
+    stale = await stale_countries(session, countries)
+    if not stale:
+        return grouped, CACHE_TTL, version
 
-    return grouped
+    logger.info(f"Top channels for {month_key} not refreshed yet for {', '.join(stale)}, serving last known ranking")
+    if schedule_refresh:
+        schedule_top_channels_refresh(stale)
+    return grouped, STALE_CACHE_TTL if channels else None, version
 
 
-async def has_today_data(session: AsyncSession) -> bool:
-    from sqlalchemy import select, func
-    from datetime import datetime, date, timezone, timedelta
+async def get_top_channels_response(
+    session: AsyncSession,
+    schedule_refresh: bool = True,
+) -> tuple[CachedResponse, Optional[str]]:
+    month_key, _ = current_month_kst()
+    cache_key = top_channels_cache_key(month_key)
 
-    kst = timezone(timedelta(hours=9))
-    now_kst = datetime.now(kst)
+    cached = await get_cached_response(cache_key)
+    if cached is not None:
+        logger.info("Returning top channels from cache")
+        return cached, await get_top_channels_etag()
 
-    month_start_kst = datetime(now_kst.year, now_kst.month, 1, 0, 0, 0, tzinfo=kst)
-    month_start_utc = month_start_kst.astimezone(timezone.utc)
+    grouped, ttl, version = await load_top_channels(session, schedule_refresh)
+    entry = await set_cached_response(cache_key, grouped, ttl)
+    if ttl:
+        if version:
+            await cache_set(top_channels_version_key(month_key), version, ttl=ttl)
+        logger.info("Cached top channels data")
+    etag = make_etag("top-channels", month_key, version) if version else None
+    return entry, etag
 
-    result = await session.execute(
-        select(func.count(TopChannel.id))
-        .where(TopChannel.created_at >= month_start_utc)
-    )
-    count = result.scalar()
-    return count > 0
+
+async def warm_top_channels_cache() -> None:
+    try:
+        async with async_session_maker() as session:
+            # Load and cache only: this runs at startup and right after a refresh, and
+            # must not start another upstream refresh when the data still looks stale
+            await get_top_channels_response(session, schedule_refresh=False)
+    except Exception as e:
+        logger.error(f"Top channels cache warm-up failed: {e}")
@@ -1,19 +1,150 @@
-
+import asyncio
 import httpx
+import logging
+import random
 from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from typing import Dict, Optional
 from aiolimiter import AsyncLimiter
-from tenacity import retry, stop_after_attempt, wait_exponential
+from tenacity import retry, retry_if_exception, stop_after_attempt, RetryCallState
+from app.core import metrics
+from app.core.http import get_http_client
+from app.core.settings import settings
+from app.services.quota import PACIFIC, Priority, QuotaExceededError, reserve_quota
+
+logger = logging.getLogger(__name__)
+
+QUOTA_REASONS = {"quotaExceeded", "dailyLimitExceeded"}
+RATE_LIMIT_REASONS = {"rateLimitExceeded", "userRateLimitExceeded"}
+
+_limiters: Dict[str, AsyncLimiter] = {}
+_semaphore: Optional[asyncio.Semaphore] = None
+_quota_exhausted_until: Optional[datetime] = None
 
-limiter = AsyncLimiter(8, 1)
 
 @asynccontextmanager
 async def backoff_client():
+    # Reuse the process-wide pooled client started in the app lifespan. Scripts that run
+    # outside the app fall back to a short-lived client.
+    client = get_http_client()
+    if client is not None:
+        yield client
+        return
+
     async with httpx.AsyncClient() as client:
         yield client
 
-@retry(wait=wait_exponential(multiplier=0.5, min=1, max=8), stop=stop_after_attempt(4))
-async def limited_get(client: httpx.AsyncClient, url: str, **kwargs):
+
+def endpoint_name(url: str) -> str:
+    return url.rstrip("/").rsplit("/", 1)[-1]
+
+
+def get_limiter(endpoint: str) -> AsyncLimiter:
+    limiter = _limiters.get(endpoint)
+    if limiter is None:
+        rate = settings.youtube_rate_limits.get(endpoint, settings.youtube_default_rate_limit)
+        limiter = AsyncLimiter(rate, 1)
+        _limiters[endpoint] = limiter
+    return limiter
+
+
+def get_semaphore() -> asyncio.Semaphore:
+    global _semaphore
+
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(settings.youtube_max_concurrency)
+    return _semaphore
+
+
+def error_reason(response: httpx.Response) -> str:
+    try:
+        errors = response.json()["error"]["errors"]
+        return errors[0].get("reason", "")
+    except Exception:
+        return ""
+
+
+def next_quota_reset(now: Optional[datetime] = None) -> datetime:
+    # YouTube daily quota resets at midnight Pacific time
+    now = (now or datetime.now(PACIFIC)).astimezone(PACIFIC)
+    return datetime(now.year, now.month, now.day, tzinfo=PACIFIC) + timedelta(days=1)
+
+
+def is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, httpx.TransportError):
+        return True
+    if isinstance(exc, httpx.HTTPStatusError):
+        status = exc.response.status_code
+        if status == 429 or status >= 500:
+            return True
+        if status == 403:
+            return error_reason(exc.response) in RATE_LIMIT_REASONS
+    return False
+
+
+def wait_jittered(retry_state: RetryCallState) -> float:
+    # Full jitter exponential backoff, but never sooner than an explicit Retry-After
+    exc = retry_state.outcome.exception() if retry_state.outcome else None
+    retry_after = 0.0
+    if isinstance(exc, httpx.HTTPStatusError):
+        try:
+            retry_after = float(exc.response.headers.get("Retry-After", 0))
+        except ValueError:
+            retry_after = 0.0
+
+    ceiling = min(8.0, 0.5 * 2 ** retry_state.attempt_number)
+    return max(retry_after, random.uniform(0.5, ceiling))
+
+
+def log_retry(retry_state: RetryCallState) -> None:
+    metrics.incr("youtube.retried")
+    exc = retry_state.outcome.exception() if retry_state.outcome else None
+    logger.warning(f"Retrying YouTube request (attempt {retry_state.attempt_number}): {exc}")
+
+
+@retry(
+    retry=retry_if_exception(is_retryable),
+    wait=wait_jittered,
+    stop=stop_after_attempt(settings.youtube_max_attempts),
+    before_sleep=log_retry,
+    reraise=True,
+)
+async def limited_get(
+    client: httpx.AsyncClient,
+    url: str,
+    *,
+    priority: Priority = Priority.NORMAL,
+    **kwargs,
+) -> httpx.Response:
+    global _quota_exhausted_until
+
+    endpoint = endpoint_name(url)
+
+    if _quota_exhausted_until is not None:
+        if datetime.now(PACIFIC) < _quota_exhausted_until:
+            metrics.incr("youtube.quota_rejected")
+            raise QuotaExceededError(f"YouTube quota exhausted until {_quota_exhausted_until.isoformat()}")
+        _quota_exhausted_until = None
+
+    await reserve_quota(endpoint, priority)
+
+    limiter = get_limiter(endpoint)
+    semaphore = get_semaphore()
+
+    if not limiter.has_capacity() or semaphore.locked():
+        metrics.incr("youtube.throttled")
+        metrics.incr(f"youtube.throttled.{endpoint}")
+
     async with limiter:
-        resp = await client.get(url, **kwargs)
-        resp.raise_for_status()
-        return resp
+        async with semaphore:
+            metrics.incr(f"youtube.requests.{endpoint}")
+            resp = await client.get(url, **kwargs)
+
+    if resp.status_code == 403 and error_reason(resp) in QUOTA_REASONS:
+        _quota_exhausted_until = next_quota_reset()
+        metrics.incr("youtube.quota_exceeded")
+        logger.error(f"YouTube quota exceeded, pausing requests until {_quota_exhausted_until.isoformat()}")
+        raise QuotaExceededError(f"YouTube quota exceeded on {endpoint}")
+
+    resp.raise_for_status()
+    return resp
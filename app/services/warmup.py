@@ -0,0 +1,85 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, List, Optional, Tuple
+from app.core import metrics
+from app.core.database import async_session_maker
+from app.core.settings import settings
+from app.services.search_service import get_full_trending, get_regions_response
+from app.services.top_channels_service import warm_top_channels_cache
+
+logger = logging.getLogger(__name__)
+
+_warmup_task: Optional[asyncio.Task] = None
+_ready = False
+
+
+async def warm_trending(region_code: str) -> None:
+    async with async_session_maker() as session:
+        await get_full_trending(session, region_code)
+
+
+def warmup_jobs() -> List[Tuple[str, Callable[[], Awaitable[None]]]]:
+    jobs = [
+        ("top_channels", warm_top_channels_cache),
+        ("regions", get_regions_response),
+    ]
+    for region_code in settings.trending_regions:
+        jobs.append((f"trending:{region_code}", lambda region_code=region_code: warm_trending(region_code)))
+    return jobs
+
+
+async def warm_caches() -> None:
+    started = time.perf_counter()
+    semaphore = asyncio.Semaphore(settings.warmup_concurrency)
+
+    async def run(name, job):
+        async with semaphore:
+            try:
+                await job()
+                metrics.incr("warmup.ok")
+            except Exception as e:
+                metrics.incr("warmup.failed")
+                logger.error(f"Cache warm-up failed for {name}: {e}")
+
+    jobs = warmup_jobs()
+    await asyncio.gather(*[run(name, job) for name, job in jobs])
+    logger.info(f"Warmed {len(jobs)} cache entries in {time.perf_counter() - started:.2f}s")
+
+
+async def _run_startup_warmup() -> None:
+    global _ready
+
+    try:
+        await warm_caches()
+    finally:
+        # A failed entry is filled by the first request instead; it must not keep the
+        # instance out of rotation
+        _ready = True
+
+
+def start_warmup() -> None:
+    global _warmup_task, _ready
+
+    if not settings.warmup_enabled:
+        _ready = True
+        return
+
+    _ready = False
+    _warmup_task = asyncio.create_task(_run_startup_warmup())
+
+
+async def stop_warmup() -> None:
+    global _warmup_task
+
+    if _warmup_task is not None and not _warmup_task.done():
+        _warmup_task.cancel()
+        try:
+            await _warmup_task
+        except asyncio.CancelledError:
+            pass
+    _warmup_task = None
+
+
+def is_ready() -> bool:
+    return _ready
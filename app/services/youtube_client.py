@@ -1,11 +1,155 @@
 
 import httpx
 import asyncio
-from typing import Any, Dict, List, Optional
-from .utils import backoff_client
+from typing import Any, Dict, List, Optional, Tuple
+from .channel_cache import cache_channels, get_cached_channels, trim_snippet
+from .quota import Priority
+from .utils import backoff_client, limited_get
 from app.core.settings import settings
 
 BASE = "https://www.googleapis.com/youtube/v3"
+CHANNEL_BATCH_SIZE = 50
+POPULAR_PAGES = 3
+
+# Channel ids currently being fetched by some caller, so overlapping regions and
+# endpoints wait for that fetch instead of requesting the same channel again
+_pending_channels: Dict[str, asyncio.Future] = {}
+
+
+async def fetch_channel_items(
+    client: httpx.AsyncClient,
+    channel_ids: List[str],
+    priority: Priority = Priority.NORMAL,
+    use_cache: bool = True,
+) -> List[Dict[str, Any]]:
+    # use_cache=False skips the cache lookup but still stores what was fetched
+    channel_ids = list(dict.fromkeys(channel_ids))
+    if not channel_ids:
+        return []
+
+    items = await get_cached_channels(channel_ids) if use_cache else {}
+
+    missing = [cid for cid in channel_ids if cid not in items]
+    waiting = {cid: _pending_channels[cid] for cid in missing if cid in _pending_channels}
+    to_fetch = [cid for cid in missing if cid not in waiting]
+
+    loop = asyncio.get_running_loop()
+    owned = {cid: loop.create_future() for cid in to_fetch}
+    _pending_channels.update(owned)
+
+    async def fetch_batch(batch_ids):
+        channels_params = {
+            "part": "snippet,statistics",
+            "id": ",".join(batch_ids),
+            "key": settings.youtube_api_key,
+        }
+        channels_response = await limited_get(
+            client, f"{BASE}/channels", params=channels_params, timeout=20, priority=priority
+        )
+        return channels_response.json().get("items", [])
+
+    batches = [to_fetch[i:i + CHANNEL_BATCH_SIZE] for i in range(0, len(to_fetch), CHANNEL_BATCH_SIZE)]
+    errors = []
+    try:
+        batch_results = await asyncio.gather(*[fetch_batch(batch) for batch in batches], return_exceptions=True)
+
+        fetched = []
+        for result in batch_results:
+            if isinstance(result, Exception):
+                errors.append(result)
+                continue
+            for item in result:
+                item = {
+                    "id": item["id"],
+                    "snippet": trim_snippet(item["snippet"]),
+                    "statistics": item["statistics"],
+                }
+                items[item["id"]] = item
+                fetched.append(item)
+
+        await cache_channels(fetched)
+    finally:
+        for cid, future in owned.items():
+            _pending_channels.pop(cid, None)
+            if not future.done():
+                future.set_result(items.get(cid))
+
+    for cid, future in waiting.items():
+        item = await future
+        if item is not None:
+            items[cid] = item
+
+    if batches and len(errors) == len(batches):
+        raise errors[0]
+
+    return [items[cid] for cid in channel_ids if cid in items]
+
+
+async def fetch_popular_channels(
+    client: httpx.AsyncClient,
+    region_code: str,
+    priority: Priority = Priority.NORMAL,
+) -> Tuple[Dict[str, int], List[Dict[str, Any]]]:
+    # Pages have to be read in order (each needs the previous nextPageToken), so the
+    # channel lookups are pipelined behind them: the channel ids first seen on a page
+    # go to channels.list while the next page is being fetched.
+    # Returns video appearances per channel id and the channel items.
+    appearances: Dict[str, int] = {}
+    lookups: List[asyncio.Task] = []
+    next_page_token = None
+
+    try:
+        for page in range(POPULAR_PAGES):
+            videos_params = {
+                "part": "snippet",
+                "chart": "mostPopular",
+                "regionCode": region_code,
+                "maxResults": 50,
+                "key": settings.youtube_api_key,
+            }
+
+            if next_page_token:
+                videos_params["pageToken"] = next_page_token
+
+            videos_response = await limited_get(
+                client, f"{BASE}/videos", params=videos_params, timeout=20, priority=priority
+            )
+            videos_data = videos_response.json()
+
+            items = videos_data.get("items", [])
+            if not items:
+                break
+
+            new_ids = []
+            for item in items:
+                channel_id = item["snippet"]["channelId"]
+                if channel_id not in appearances:
+                    new_ids.append(channel_id)
+                appearances[channel_id] = appearances.get(channel_id, 0) + 1
+
+            if new_ids:
+                lookups.append(asyncio.create_task(fetch_channel_items(client, new_ids, priority)))
+
+            next_page_token = videos_data.get("nextPageToken")
+            if not next_page_token:
+                break
+    except BaseException:
+        for lookup in lookups:
+            lookup.cancel()
+        await asyncio.gather(*lookups, return_exceptions=True)
+        raise
+
+    results = await asyncio.gather(*lookups, return_exceptions=True)
+    errors = [result for result in results if isinstance(result, BaseException)]
+    if lookups and len(errors) == len(lookups):
+        raise errors[0]
+
+    channel_items = []
+    for result in results:
+        if not isinstance(result, BaseException):
+            channel_items.extend(result)
+    return appearances, channel_items
+
 
 async def get_i18n_regions() -> List[Dict[str, str]]:
     async with backoff_client() as client:
@@ -14,8 +158,7 @@ async def get_i18n_regions() -> List[Dict[str, str]]:
             "key": settings.youtube_api_key,
         }
 
-        response = await client.get(f"{BASE}/i18nRegions", params=params, timeout=20)
-        response.raise_for_status()
+        response = await limited_get(client, f"{BASE}/i18nRegions", params=params, timeout=20)
         data = response.json()
 
         regions = []
@@ -37,64 +180,22 @@ async def search_videos_recent_week(q: str, max_results: int = 25) -> Dict[str,
         "key": settings.youtube_api_key,
     }
     async with backoff_client() as client:
-        r = await client.get(f"{BASE}/search", params=params, timeout=20)
-        r.raise_for_status()
+        r = await limited_get(
+            client, f"{BASE}/search", params=params, timeout=20, priority=Priority.LOW
+        )
         return r.json()
 
-async def get_trending_channels(region_code: str = "KR", max_results: int = 50) -> Dict[str, Any]:
+async def get_trending_channels(
+    region_code: str = "KR",
+    max_results: int = 50,
+    priority: Priority = Priority.NORMAL,
+) -> Dict[str, Any]:
     async with backoff_client() as client:
-        all_channels_dict = {}
-        next_page_token = None
-        pages_to_fetch = 3
-
-        for page in range(pages_to_fetch):
-            videos_params = {
-                "part": "snippet",
-                "chart": "mostPopular",
-                "regionCode": region_code,
-                "maxResults": 50,
-                "key": settings.youtube_api_key,
-            }
-
-            if next_page_token:
-                videos_params["pageToken"] = next_page_token
-
-            videos_response = await client.get(f"{BASE}/videos", params=videos_params, timeout=20)
-            videos_response.raise_for_status()
-            videos_data = videos_response.json()
-
-            items = videos_data.get("items", [])
-            if not items:
-                break
-
-            for item in items:
-                channel_id = item["snippet"]["channelId"]
-                all_channels_dict[channel_id] = all_channels_dict.get(channel_id, 0) + 1
-
-            next_page_token = videos_data.get("nextPageToken")
-            if not next_page_token:
-                break
+        all_channels_dict, all_channels = await fetch_popular_channels(client, region_code, priority)
 
         if not all_channels_dict:
             return {"channels": [], "regionCode": region_code}
 
-        channel_ids = list(all_channels_dict.keys())
-        all_channels = []
-        batch_size = 50
-
-        for i in range(0, len(channel_ids), batch_size):
-            batch_ids = channel_ids[i:i + batch_size]
-            channels_params = {
-                "part": "snippet,statistics",
-                "id": ",".join(batch_ids),
-                "key": settings.youtube_api_key,
-            }
-
-            channels_response = await client.get(f"{BASE}/channels", params=channels_params, timeout=20)
-            channels_response.raise_for_status()
-            channels_data = channels_response.json()
-            all_channels.extend(channels_data.get("items", []))
-
         results = []
         for channel in all_channels:
             channel_country = channel["snippet"].get("country", "")
@@ -140,8 +241,9 @@ async def search_channel_by_name(channel_name: str) -> Optional[str]:
         }
 
         try:
-            response = await client.get(f"{BASE}/search", params=search_params, timeout=10)
-            response.raise_for_status()
+            response = await limited_get(
+                client, f"{BASE}/search", params=search_params, timeout=10, priority=Priority.LOW
+            )
             data = response.json()
 
             items = data.get("items", [])
@@ -164,37 +266,16 @@ async def search_channel_by_name(channel_name: str) -> Optional[str]:
         return None
 
 
-async def get_channels_by_ids(channel_ids: List[str]) -> List[Dict[str, Any]]:
+async def get_channels_by_ids(
+    channel_ids: List[str],
+    priority: Priority = Priority.NORMAL,
+    use_cache: bool = True,
+) -> List[Dict[str, Any]]:
     if not channel_ids:
         return []
 
     async with backoff_client() as client:
-        batch_size = 50
-
-        batches = []
-        for i in range(0, len(channel_ids), batch_size):
-            batch_ids = channel_ids[i:i + batch_size]
-            batches.append(batch_ids)
-
-        async def fetch_batch(batch_ids):
-            channels_params = {
-                "part": "snippet,statistics",
-                "id": ",".join(batch_ids),
-                "key": settings.youtube_api_key,
-            }
-            channels_response = await client.get(f"{BASE}/channels", params=channels_params, timeout=20)
-            channels_response.raise_for_status()
-            channels_data = channels_response.json()
-            return channels_data.get("items", [])
-
-        batch_results = await asyncio.gather(*[fetch_batch(batch) for batch in batches], return_exceptions=True)
-
-        all_channels_data = []
-        for result in batch_results:
-            if isinstance(result, list):
-                all_channels_data.extend(result)
-            elif isinstance(result, Exception):
-                pass
+        all_channels_data = await fetch_channel_items(client, channel_ids, priority, use_cache)
 
         channels = []
         for channel in all_channels_data:
@@ -211,6 +292,7 @@ async def get_channels_by_ids(channel_ids: List[str]) -> List[Dict[str, Any]]:
                 "videoCount": video_count,
                 "viewCount": view_count,
                 "customUrl": channel["snippet"].get("customUrl", ""),
+                "country": channel["snippet"].get("country", ""),
                 "publishedAt": channel["snippet"].get("publishedAt", ""),
             })
 
@@ -218,6 +300,36 @@ async def get_channels_by_ids(channel_ids: List[str]) -> List[Dict[str, Any]]:
         return channels
 
 
+async def get_channel_statistics(
+    channel_ids: List[str],
+    priority: Priority = Priority.NORMAL,
+) -> Dict[str, Dict[str, int]]:
+    # statistics part only, for channels whose snippet the caller already has. Bypasses
+    # the channel cache: callers want current counts, not the last cached ones.
+    channel_ids = list(dict.fromkeys(channel_ids))
+    if not channel_ids:
+        return {}
+
+    async def fetch_batch(client, batch_ids):
+        params = {"part": "statistics", "id": ",".join(batch_ids), "key": settings.youtube_api_key}
+        response = await limited_get(client, f"{BASE}/channels", params=params, timeout=20, priority=priority)
+        return response.json().get("items", [])
+
+    batches = [channel_ids[i:i + CHANNEL_BATCH_SIZE] for i in range(0, len(channel_ids), CHANNEL_BATCH_SIZE)]
+    async with backoff_client() as client:
+        results = await asyncio.gather(*[fetch_batch(client, batch) for batch in batches])
+
+    statistics = {}
+    for items in results:
+        for item in items:
+            statistics[item["id"]] = {
+                "subscriberCount": int(item["statistics"].get("subscriberCount", 0)),
+                "videoCount": int(item["statistics"].get("videoCount", 0)),
+                "viewCount": int(item["statistics"].get("viewCount", 0)),
+            }
+    return statistics
+
+
 async def get_channels_by_names(channel_names: List[str]) -> List[Dict[str, Any]]:
     search_tasks = [search_channel_by_name(name) for name in channel_names]
     search_results = await asyncio.gather(*search_tasks, return_exceptions=True)
@@ -232,62 +344,17 @@ async def get_channels_by_names(channel_names: List[str]) -> List[Dict[str, Any]
     return await get_channels_by_ids(channel_ids)
 
 
-async def get_top_channels_by_country(country_code: str, top_n: int = 5) -> List[Dict[str, Any]]:
+async def get_top_channels_by_country(
+    country_code: str,
+    top_n: int = 5,
+    priority: Priority = Priority.NORMAL,
+) -> List[Dict[str, Any]]:
     async with backoff_client() as client:
-        all_channel_ids = set()
-        page_token = None
-        pages_to_fetch = 3
-
-        for page in range(pages_to_fetch):
-            videos_params = {
-                "part": "snippet",
-                "chart": "mostPopular",
-                "regionCode": country_code,
-                "maxResults": 50,
-                "key": settings.youtube_api_key,
-            }
-
-            if page_token:
-                videos_params["pageToken"] = page_token
-
-            videos_response = await client.get(f"{BASE}/videos", params=videos_params, timeout=20)
-            videos_response.raise_for_status()
-            videos_data = videos_response.json()
-
-            items = videos_data.get("items", [])
-            if not items:
-                break
-
-            for item in items:
-                channel_id = item["snippet"]["channelId"]
-                all_channel_ids.add(channel_id)
-
-            page_token = videos_data.get("nextPageToken")
-            if not page_token:
-                break
-
-        channel_ids = all_channel_ids
+        channel_ids, all_channels_data = await fetch_popular_channels(client, country_code, priority)
 
         if not channel_ids:
             return []
 
-        all_channels_data = []
-        channel_ids_list = list(channel_ids)
-        batch_size = 50
-
-        for i in range(0, len(channel_ids_list), batch_size):
-            batch_ids = channel_ids_list[i:i + batch_size]
-            channels_params = {
-                "part": "snippet,statistics",
-                "id": ",".join(batch_ids),
-                "key": settings.youtube_api_key,
-            }
-
-            channels_response = await client.get(f"{BASE}/channels", params=channels_params, timeout=20)
-            channels_response.raise_for_status()
-            channels_data = channels_response.json()
-            all_channels_data.extend(channels_data.get("items", []))
-
         channels = []
         for channel in all_channels_data:
             channel_country = channel["snippet"].get("country", "")
@@ -308,6 +375,7 @@ async def get_top_channels_by_country(country_code: str, top_n: int = 5) -> List
                 "videoCount": video_count,
                 "viewCount": view_count,
                 "customUrl": channel["snippet"].get("customUrl", ""),
+                "country": channel["snippet"].get("country", ""),
                 "publishedAt": channel["snippet"].get("publishedAt", ""),
             })
 
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+다중 키 캐시 읽기/쓰기 벤치마크
+
+트렌딩 응답 하나에 필요한 채널 캐시(채널 N개 x snippet/statistics 2키)를
+읽고 쓰는 시간을 비교합니다.
+
+- looped: cache_get / cache_set을 키마다 순서대로 호출 (키 수만큼 왕복)
+- batched: cache_get_many(MGET) / cache_set_many(파이프라인 SETEX)로 한 번에 처리
+
+L1 캐시를 끈 상태로 Redis 왕복 비용만 측정합니다.
+
+사용법:
+    REDIS_URL=redis://localhost:6379/0 \\
+        python scripts/bench_cache_batch.py --channels 50 --rounds 20
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.redis import cache_clear_pattern, cache_get, cache_get_many, cache_set, cache_set_many, close_redis
+from app.core.settings import settings
+
+KEY_PREFIX = "bench:batch"
+
+
+def fake_entries(channels: int) -> list:
+    entries = []
+    for index in range(channels):
+        channel_id = f"UC{index:022d}"
+        entries.append((f"{KEY_PREFIX}:snippet:{channel_id}", {"title": f"채널 {index}", "country": "KR"}, 600))
+        entries.append((f"{KEY_PREFIX}:stats:{channel_id}", {"subscriberCount": str(index)}, 300))
+    return entries
+
+
+async def looped(entries: list) -> None:
+    for key, value, ttl in entries:
+        await cache_set(key, value, ttl=ttl)
+    for key, _, _ in entries:
+        await cache_get(key)
+
+
+async def batched(entries: list) -> None:
+    await cache_set_many(entries)
+    await cache_get_many([key for key, _, _ in entries])
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--channels", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    settings.l1_cache_enabled = False
+    entries = fake_entries(args.channels)
+    if not await cache_set(f"{KEY_PREFIX}:ping", 1, ttl=10):
+        print("Redis에 연결할 수 없습니다")
+        return
+
+    print(f"channels={args.channels} keys={len(entries)} rounds={args.rounds}")
+    print(f"{'mode':<9}{'median ms':>11}")
+    try:
+        for name, run in (("looped", looped), ("batched", batched)):
+            timings = []
+            for _ in range(args.rounds):
+                started = time.perf_counter()
+                await run(entries)
+                timings.append((time.perf_counter() - started) * 1000)
+            print(f"{name:<9}{statistics.median(timings):>11.2f}")
+    finally:
+        await cache_clear_pattern(f"{KEY_PREFIX}:*")
+        await close_redis()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+HTTP 클라이언트 벤치마크
+
+요청마다 새 httpx.AsyncClient를 만드는 기존 방식과, 앱 lifespan에서 생성하는
+공유 커넥션 풀 클라이언트를 로컬 스텁 서버에 대해 비교합니다.
+
+- connections: 스텁 서버가 accept한 TCP 연결 수 (실서버에서는 연결마다 TLS 핸드셰이크 1회)
+- p50 / p99: 요청 지연 시간 (ms)
+
+사용법:
+    python scripts/bench_http_client.py --requests 300 --concurrency 30 --latency-ms 50
+
+참고:
+    - httpx는 TLS(ALPN) 위에서만 HTTP/2를 협상하므로 평문 스텁 서버에서는
+      HTTP/1.1 keep-alive 기준으로 측정합니다.
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.http import build_http_client
+from app.core.settings import settings
+
+BODY = b'{"kind":"youtube#channelListResponse","items":[]}'
+
+
+class StubServer:
+    """keep-alive를 지원하는 최소한의 HTTP/1.1 서버"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.connections = 0
+        self.server: asyncio.base_events.Server | None = None
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                if not head:
+                    break
+                await asyncio.sleep(self.latency)
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\n"
+                    b"Content-Type: application/json\r\n"
+                    b"Content-Length: " + str(len(BODY)).encode() + b"\r\n"
+                    b"Connection: keep-alive\r\n\r\n" + BODY
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self) -> int:
+        self.server = await asyncio.start_server(self.handle, "127.0.0.1", 0)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+
+async def per_call_get(url: str) -> None:
+    async with httpx.AsyncClient() as client:
+        response = await client.get(url, params={"part": "snippet"})
+        response.raise_for_status()
+
+
+async def run_mode(name: str, url: str, total: int, concurrency: int, latency: float) -> dict:
+    stub = StubServer(latency)
+    port = await stub.start()
+    target = url.format(port=port)
+
+    shared = build_http_client() if name == "shared" else None
+    semaphore = asyncio.Semaphore(concurrency)
+    timings = []
+
+    async def one():
+        async with semaphore:
+            started = time.perf_counter()
+            if shared is not None:
+                response = await shared.get(target, params={"part": "snippet"})
+                response.raise_for_status()
+            else:
+                await per_call_get(target)
+            timings.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[one() for _ in range(total)])
+    elapsed = time.perf_counter() - started
+
+    if shared is not None:
+        await shared.aclose()
+    await stub.stop()
+
+    timings.sort()
+    return {
+        "mode": name,
+        "connections": stub.connections,
+        "p50": statistics.median(timings),
+        "p99": timings[min(len(timings) - 1, int(len(timings) * 0.99))],
+        "rps": total / elapsed,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=30)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    args = parser.parse_args()
+
+    url = "http://127.0.0.1:{port}/youtube/v3/channels"
+    latency = args.latency_ms / 1000
+
+    print(f"requests={args.requests} concurrency={args.concurrency} latency={args.latency_ms}ms "
+          f"pool={settings.http_max_connections}/{settings.http_max_keepalive_connections}")
+    print(f"{'mode':<10}{'connections':>12}{'p50 ms':>10}{'p99 ms':>10}{'req/s':>10}")
+    for mode in ("per-call", "shared"):
+        r = await run_mode(mode, url, args.requests, args.concurrency, latency)
+        print(f"{r['mode']:<10}{r['connections']:>12}{r['p50']:>10.2f}{r['p99']:>10.2f}{r['rps']:>10.0f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+응답 캐시 부하 테스트
+
+캐시 히트 시 두 가지 응답 경로의 처리량(req/s)을 비교합니다.
+
+- before: cache_get으로 dict를 꺼내 FastAPI가 다시 검증/직렬화 (기존 방식)
+- after: 미리 직렬화(및 gzip)된 응답 바이트를 Response로 그대로 반환
+
+/api/top-channels와 같은 크기의 페이로드(국가 3개 x 채널 50개)를 Redis에 넣고,
+httpx ASGITransport로 앱을 프로세스 내에서 호출하므로 네트워크를 제외한
+서버 측 비용만 측정합니다.
+
+사용법:
+    REDIS_URL=redis://localhost:6379/0 \\
+        python scripts/bench_response_cache.py --requests 3000 --concurrency 50
+
+    # L1 캐시 없이 Redis 경로만 측정
+    python scripts/bench_response_cache.py --no-l1
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import httpx
+from fastapi import FastAPI, Request
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.redis import cache_delete, cache_get, cache_set
+from app.core.response_cache import get_cached_response, set_cached_response, to_response
+from app.core.settings import settings
+
+# Separate keys: the local tier stores a dict for one path and prepared bytes for the other
+BEFORE_KEY = "bench:top_channels:before"
+AFTER_KEY = "bench:top_channels:after"
+
+
+def fake_top_channels(per_country: int) -> dict:
+    return {
+        country: [
+            {
+                "rank": rank,
+                "channelId": f"UC{country}{rank:020d}",
+                "title": f"채널 {rank}",
+                "description": "채널 설명입니다. " * 20,
+                "thumbnailUrl": f"https://yt3.ggpht.com/{country}/{rank}.jpg",
+                "subscriberCount": 10_000_000 - rank,
+                "videoCount": 500 + rank,
+                "viewCount": 1_000_000_000 - rank,
+                "customUrl": f"@channel{rank}",
+                "publishedAt": "2020-01-01T00:00:00Z",
+                "updatedAt": "2026-10-01T00:00:00+00:00",
+            }
+            for rank in range(1, per_country + 1)
+        ]
+        for country in ("KR", "JP", "US")
+    }
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/before")
+    async def before():
+        return await cache_get(BEFORE_KEY)
+
+    @app.get("/after")
+    async def after(request: Request):
+        return to_response(request, await get_cached_response(AFTER_KEY))
+
+    return app
+
+
+async def run_mode(client: httpx.AsyncClient, path: str, total: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            response = await client.get(path, headers={"Accept-Encoding": "gzip"})
+            response.raise_for_status()
+
+    # Warm up the local tier so both modes measure steady-state hits
+    await one()
+    started = time.perf_counter()
+    await asyncio.gather(*[one() for _ in range(total)])
+    return total / (time.perf_counter() - started)
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--per-country", type=int, default=50)
+    parser.add_argument("--no-l1", action="store_true")
+    args = parser.parse_args()
+
+    settings.l1_cache_enabled = not args.no_l1
+
+    payload = fake_top_channels(args.per_country)
+    if not await cache_set(BEFORE_KEY, payload, ttl=600):
+        print("Redis에 연결할 수 없습니다")
+        return
+    await set_cached_response(AFTER_KEY, payload, ttl=600)
+
+    transport = httpx.ASGITransport(app=build_app())
+    print(f"requests={args.requests} concurrency={args.concurrency} l1={settings.l1_cache_enabled}")
+    print(f"{'mode':<8}{'req/s':>10}")
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for mode in ("before", "after"):
+                rps = await run_mode(client, f"/{mode}", args.requests, args.concurrency)
+                print(f"{mode:<8}{rps:>10.0f}")
+    finally:
+        await cache_delete(BEFORE_KEY)
+        await cache_delete(AFTER_KEY)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
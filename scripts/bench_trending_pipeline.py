@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+트렌딩 수집 파이프라인 벤치마크
+
+지연 시간을 흉내 내는 로컬 YouTube API 목(httpx.MockTransport)에 대해
+캐시가 비어 있는 트렌딩 요청 1회의 전체 소요 시간을 비교합니다.
+
+- sequential: 3페이지를 순서대로 받은 뒤 channels.list 배치도 하나씩 순서대로 호출 (기존 방식)
+- batched: 3페이지를 순서대로 받은 뒤 channels.list 배치를 동시에 호출
+- pipelined: 페이지마다 새로 나온 채널 ID를 바로 channels.list로 보내고, 그동안 다음 페이지를 받음
+
+channels.list 응답 시간은 `--latency-ms + 채널 수 x --per-id-ms`로 모델링합니다.
+
+사용법:
+    python scripts/bench_trending_pipeline.py --latency-ms 120 --per-id-ms 2 --rounds 5
+
+참고:
+    - 매 라운드 새로운 채널 ID를 사용하므로 채널 캐시가 결과에 영향을 주지 않습니다
+    - Redis가 없어도 동작합니다 (캐시/할당량 기록은 실패 시 건너뜀)
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import app.core.http as http
+from app.core.settings import settings
+from app.services import youtube_client
+from app.services.utils import limited_get
+
+BASE = youtube_client.BASE
+DISTINCT_CHANNELS = 120
+
+
+def make_handler(latency: float, per_id: float, calls: list):
+    async def handler(request: httpx.Request) -> httpx.Response:
+        endpoint = request.url.path.rsplit("/", 1)[-1]
+        calls.append(endpoint)
+
+        if endpoint == "videos":
+            await asyncio.sleep(latency)
+            seed = request.url.params["regionCode"]
+            page = int(request.url.params.get("pageToken", "0"))
+            # 120 distinct channels over 150 videos: pages 1-2 are all new, page 3 mostly repeats
+            items = [
+                {"snippet": {"channelId": f"UC{seed}{(page * 50 + i) % DISTINCT_CHANNELS:04d}"}}
+                for i in range(50)
+            ]
+            body = {"items": items}
+            if page < 2:
+                body["nextPageToken"] = str(page + 1)
+            return httpx.Response(200, json=body)
+
+        ids = request.url.params["id"].split(",")
+        await asyncio.sleep(latency + per_id * len(ids))
+        items = [
+            {
+                "id": cid,
+                "snippet": {
+                    "title": cid, "description": "", "country": "KR",
+                    "thumbnails": {"default": {"url": "u"}},
+                },
+                "statistics": {"subscriberCount": "1", "videoCount": "1", "viewCount": "1"},
+            }
+            for cid in ids
+        ]
+        return httpx.Response(200, json={"items": items})
+
+    return handler
+
+
+async def fetch_pages(client: httpx.AsyncClient, region_code: str) -> list:
+    channel_ids = {}
+    next_page_token = None
+    for _ in range(youtube_client.POPULAR_PAGES):
+        params = {"part": "snippet", "chart": "mostPopular", "regionCode": region_code, "maxResults": 50}
+        if next_page_token:
+            params["pageToken"] = next_page_token
+        data = (await limited_get(client, f"{BASE}/videos", params=params)).json()
+        for item in data.get("items", []):
+            channel_ids[item["snippet"]["channelId"]] = True
+        next_page_token = data.get("nextPageToken")
+        if not next_page_token:
+            break
+    return list(channel_ids)
+
+
+def batches(channel_ids: list) -> list:
+    size = youtube_client.CHANNEL_BATCH_SIZE
+    return [channel_ids[i:i + size] for i in range(0, len(channel_ids), size)]
+
+
+async def get_batch(client: httpx.AsyncClient, batch: list) -> list:
+    params = {"part": "snippet,statistics", "id": ",".join(batch)}
+    return (await limited_get(client, f"{BASE}/channels", params=params)).json()["items"]
+
+
+async def run_sequential(client: httpx.AsyncClient, region_code: str) -> None:
+    for batch in batches(await fetch_pages(client, region_code)):
+        await get_batch(client, batch)
+
+
+async def run_batched(client: httpx.AsyncClient, region_code: str) -> None:
+    channel_ids = await fetch_pages(client, region_code)
+    await asyncio.gather(*[get_batch(client, batch) for batch in batches(channel_ids)])
+
+
+async def run_pipelined(client: httpx.AsyncClient, region_code: str) -> None:
+    await youtube_client.fetch_popular_channels(client, region_code)
+
+
+async def no_channel_cache(channel_ids):
+    return {}
+
+
+async def skip_cache_write(items):
+    return None
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency-ms", type=float, default=120.0)
+    parser.add_argument("--per-id-ms", type=float, default=2.0)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    # Measure the fetch path only: no rate limiting or channel cache in the way
+    settings.youtube_rate_limits = {endpoint: 10_000.0 for endpoint in settings.youtube_rate_limits}
+    youtube_client.get_cached_channels = no_channel_cache
+    youtube_client.cache_channels = skip_cache_write
+
+    calls = []
+    http._http_client = httpx.AsyncClient(
+        transport=httpx.MockTransport(make_handler(args.latency_ms / 1000, args.per_id_ms / 1000, calls))
+    )
+
+    print(f"latency={args.latency_ms}ms per_id={args.per_id_ms}ms rounds={args.rounds}")
+    print(f"{'mode':<11}{'median ms':>11}{'calls':>7}")
+    try:
+        for name, run in (("sequential", run_sequential), ("batched", run_batched), ("pipelined", run_pipelined)):
+            timings = []
+            calls.clear()
+            for round_number in range(args.rounds):
+                started = time.perf_counter()
+                await run(http._http_client, f"{name[:3]}{round_number}")
+                timings.append((time.perf_counter() - started) * 1000)
+            print(f"{name:<11}{statistics.median(timings):>11.0f}{len(calls) // args.rounds:>7}")
+    finally:
+        await http._http_client.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -4,10 +4,11 @@
 
 이 스크립트는 한 번만 실행하면 됩니다.
 YouTube API를 사용하여 채널 이름으로 채널 ID를 검색하고,
-그 결과를 Python 코드 형식으로 출력합니다.
+그 결과를 import_tracked_channels.py로 등록할 수 있는 JSONL 형식으로 저장합니다.
 
 사용법:
-    python scripts/collect_channel_ids.py
+    python scripts/collect_channel_ids.py -o channels.jsonl
+    python scripts/import_tracked_channels.py channels.jsonl
 
 주의:
     - 이 스크립트는 약 9,000 API 유닛을 사용합니다
@@ -15,13 +16,16 @@ YouTube API를 사용하여 채널 이름으로 채널 ID를 검색하고,
     - 할당량 초과 시 내일 다시 실행하세요
 """
 
+import argparse
 import asyncio
+import json
 import sys
 from pathlib import Path
 
 # Add parent directory to path to import app modules
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from app.core.http import init_http_client, close_http_client
 from app.services.youtube_client import search_channel_by_name
 from app.services.channel_names import CHANNEL_NAMES
 
@@ -67,7 +71,7 @@ async def collect_ids_for_country(country_code: str, channel_names: list) -> dic
     return results
 
 
-async def main():
+async def main(args):
     print("="*60)
     print("YouTube 채널 ID 수집 스크립트")
     print("="*60)
@@ -88,31 +92,19 @@ async def main():
         results = await collect_ids_for_country(country_code, channel_names)
         all_results[country_code] = results
 
-    # Print results in Python code format
-    print("\n" + "="*60)
-    print("결과 (app/services/channel_names.py 에 복사하세요)")
-    print("="*60 + "\n")
-
-    print("CHANNEL_IDS = {")
-
-    for country_code in ["KR", "JP", "US"]:
-        if country_code not in all_results:
-            continue
-
-        print(f'    "{country_code}": [')
-
-        for item in all_results[country_code]:
-            name = item["name"]
-            channel_id = item["id"]
-
-            if channel_id:
-                print(f'        "{channel_id}",  # {name}')
-            else:
-                print(f'        # NOT FOUND: {name}')
-
-        print("    ],")
-
-    print("}")
+    # JSONL for scripts/import_tracked_channels.py; earlier names get a higher priority
+    with args.output.open("w", encoding="utf-8") as f:
+        for country_code, results in all_results.items():
+            for index, item in enumerate(results):
+                if not item["id"]:
+                    continue
+                record = {
+                    "channel_id": item["id"],
+                    "country_code": country_code,
+                    "priority": len(results) - index,
+                    "name": item["name"],
+                }
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
 
     # Print summary
     print("\n" + "="*60)
@@ -129,8 +121,22 @@ async def main():
 
         print(f"{country_code}: 총 {total}개, 찾음 {found}개, 못 찾음 {not_found}개")
 
-    print("\n완료! 위의 CHANNEL_IDS를 app/services/channel_names.py 파일에 복사하세요.")
+    print(f"\n완료! {args.output} 파일을 등록하세요:")
+    print(f"    python scripts/import_tracked_channels.py {args.output}")
+
+
+async def run():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-o", "--output", type=Path, default=Path("tracked_channels.jsonl"))
+    args = parser.parse_args()
+
+    # 모든 검색 요청이 하나의 커넥션 풀을 공유하도록 클라이언트를 한 번만 생성
+    await init_http_client()
+    try:
+        await main(args)
+    finally:
+        await close_http_client()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    asyncio.run(run())
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+추적 채널 일괄 등록 스크립트
+
+CSV 또는 JSONL 파일의 채널 목록을 tracked_channels 테이블에 등록합니다.
+국가별 순위 갱신은 이 테이블의 채널을 우선순위 순으로 50개씩 읽어 조회합니다.
+
+파일 형식:
+    CSV (헤더 필수):
+        channel_id,country_code,priority,name
+        UCOmHUn--16B90oW2L6FRR3A,KR,100,BLACKPINK
+
+    JSONL (한 줄에 하나):
+        {"channel_id": "UCOmHUn--16B90oW2L6FRR3A", "country_code": "KR", "priority": 100, "name": "BLACKPINK"}
+
+    priority(기본 0)가 클수록 먼저 조회하며, name은 선택입니다.
+
+사용법:
+    python scripts/import_tracked_channels.py channels.csv
+    python scripts/collect_channel_ids.py -o channels.jsonl && python scripts/import_tracked_channels.py channels.jsonl
+
+참고:
+    - 이미 등록된 (country_code, channel_id)는 priority/name만 갱신합니다
+    - 파일 전체를 하나의 트랜잭션으로 처리하므로 잘못된 줄이 있으면 아무것도 반영되지 않습니다
+    - API 할당량을 사용하지 않습니다
+"""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.database import engine
+from app.services.channel_registry import import_tracked_channels, read_tracked_channels
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("path", type=Path, help="CSV(.csv) 또는 JSONL 파일")
+    args = parser.parse_args()
+
+    try:
+        imported = await import_tracked_channels(read_tracked_channels(args.path))
+    except ValueError as e:
+        print(f"잘못된 항목: {e}")
+        sys.exit(1)
+    finally:
+        await engine.dispose()
+
+    print(f"{imported}개 채널을 등록했습니다")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
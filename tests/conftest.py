@@ -0,0 +1,25 @@
+import pytest
+from app.core import metrics
+from app.core import redis as redis_module
+from app.core.settings import settings
+
+
+@pytest.fixture(scope="session")
+def redis_server():
+    # Throwaway redis-server on a unix socket, from the redislite dev dependency
+    redislite = pytest.importorskip("redislite")
+    server = redislite.Redis()
+    yield server
+    server.shutdown()
+
+
+@pytest.fixture
+async def live_redis(redis_server, monkeypatch):
+    redis_server.flushall()
+    monkeypatch.setattr(settings, "redis_url", f"unix://{redis_server.socket_file}")
+    await redis_module.close_redis()
+    redis_module._l1.clear()
+    metrics.reset()
+    yield redis_server
+    await redis_module.close_redis()
+    redis_module._l1.clear()
@@ -0,0 +1,116 @@
+import asyncio
+from contextlib import asynccontextmanager
+import httpx
+import pytest
+from app.services import utils, youtube_client
+from app.services.youtube_client import fetch_channel_items
+
+def channel_item(channel_id):
+    return {
+        "id": channel_id,
+        "snippet": {"title": channel_id, "description": "", "thumbnails": {"default": {"url": "u"}}},
+        "statistics": {"subscriberCount": "10"},
+    }
+
+@pytest.fixture
+async def youtube(monkeypatch):
+    store = {}
+    requested = []
+
+    async def get_cached_channels(channel_ids):
+        return {cid: store[cid] for cid in channel_ids if cid in store}
+
+    async def cache_channels(items):
+        store.update({item["id"]: item for item in items})
+
+    async def no_ledger(endpoint, priority):
+        return None
+
+    async def handler(request):
+        ids = request.url.params["id"].split(",")
+        requested.extend(ids)
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json={"items": [channel_item(cid) for cid in ids]})
+
+    monkeypatch.setattr(youtube_client, "get_cached_channels", get_cached_channels)
+    monkeypatch.setattr(youtube_client, "cache_channels", cache_channels)
+    monkeypatch.setattr(utils, "reserve_quota", no_ledger)
+    monkeypatch.setattr(utils, "_semaphore", None)
+    monkeypatch.setattr(utils, "_limiters", {})
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        yield client, requested
+
+@pytest.mark.asyncio
+async def test_overlapping_regions_fetch_each_channel_once(youtube):
+    client, requested = youtube
+    kr = ["UCblackpink", "UCmrbeast", "UCkr1"]
+    us = ["UCmrbeast", "UCblackpink", "UCus1"]
+
+    kr_items, us_items = await asyncio.gather(
+        fetch_channel_items(client, kr),
+        fetch_channel_items(client, us),
+    )
+
+    assert sorted(requested) == sorted(set(kr + us))
+    assert [item["id"] for item in kr_items] == kr
+    assert [item["id"] for item in us_items] == us
+
+@pytest.mark.asyncio
+async def test_cached_channels_are_not_refetched(youtube):
+    client, requested = youtube
+
+    await fetch_channel_items(client, ["UCa", "UCb"])
+    items = await fetch_channel_items(client, ["UCb", "UCc", "UCa"])
+
+    assert requested == ["UCa", "UCb", "UCc"]
+    assert [item["id"] for item in items] == ["UCb", "UCc", "UCa"]
+
+@pytest.mark.asyncio
+async def test_channel_lookups_overlap_the_next_page(youtube):
+    events = []
+
+    async def handler(request):
+        endpoint = request.url.path.rsplit("/", 1)[-1]
+        if endpoint == "videos":
+            page = int(request.url.params.get("pageToken", "0"))
+            events.append(f"videos:{page}:start")
+            await asyncio.sleep(0.02)
+            events.append(f"videos:{page}:end")
+            body = {"items": [{"snippet": {"channelId": f"UC{page}{i}"}} for i in range(3)]}
+            if page < 2:
+                body["nextPageToken"] = str(page + 1)
+            return httpx.Response(200, json=body)
+
+        ids = request.url.params["id"].split(",")
+        events.append(f"channels:{ids[0][2]}:start")
+        await asyncio.sleep(0.02)
+        return httpx.Response(200, json={"items": [channel_item(cid) for cid in ids]})
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        appearances, items = await youtube_client.fetch_popular_channels(client, "KR")
+
+    assert len(appearances) == 9
+    assert sorted(item["id"] for item in items) == sorted(appearances)
+    # page 0's channels are looked up while page 1 is still loading
+    assert events.index("channels:0:start") < events.index("videos:1:end")
+
+@pytest.mark.asyncio
+async def test_channel_statistics_requests_only_the_statistics_part(youtube, monkeypatch):
+    parts = []
+
+    async def handler(request):
+        parts.append(request.url.params["part"])
+        ids = request.url.params["id"].split(",")
+        return httpx.Response(200, json={"items": [{"id": cid, "statistics": {"subscriberCount": "7"}} for cid in ids]})
+
+    @asynccontextmanager
+    async def mock_client():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            yield client
+
+    monkeypatch.setattr(youtube_client, "backoff_client", mock_client)
+
+    statistics = await youtube_client.get_channel_statistics([f"UC{i}" for i in range(60)])
+
+    assert parts == ["statistics", "statistics"]
+    assert statistics["UC59"] == {"subscriberCount": 7, "videoCount": 0, "viewCount": 0}
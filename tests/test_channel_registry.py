@@ -0,0 +1,55 @@
+import os
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+import app.models  # noqa: F401  register every table on Base.metadata
+from app.core.database import Base
+from app.services import channel_registry
+from app.services.channel_registry import read_tracked_channels, tracked_channel_batches
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+
+def test_reads_csv_and_jsonl(tmp_path):
+    csv_path = tmp_path / "channels.csv"
+    csv_path.write_text("channel_id,country_code,priority,name\nUCa,kr,10,A\nUCb,JP,,\n", encoding="utf-8")
+    jsonl_path = tmp_path / "channels.jsonl"
+    jsonl_path.write_text('{"channel_id": "UCa", "country_code": "KR", "priority": 10, "name": "A"}\n\n', encoding="utf-8")
+
+    assert list(read_tracked_channels(csv_path)) == [
+        {"country_code": "KR", "channel_id": "UCa", "priority": 10, "name": "A"},
+        {"country_code": "JP", "channel_id": "UCb", "priority": 0, "name": None},
+    ]
+    assert list(read_tracked_channels(jsonl_path)) == list(read_tracked_channels(csv_path))[:1]
+
+
+def test_rejects_rows_without_country(tmp_path):
+    path = tmp_path / "channels.jsonl"
+    path.write_text('{"channel_id": "UCa"}\n', encoding="utf-8")
+
+    with pytest.raises(ValueError):
+        list(read_tracked_channels(path))
+
+
+@pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL is not set")
+async def test_batches_page_through_registry_by_priority(monkeypatch):
+    engine = create_async_engine(TEST_DATABASE_URL)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    monkeypatch.setattr(channel_registry, "async_session_maker", async_sessionmaker(engine, expire_on_commit=False))
+
+    try:
+        rows = [{"channel_id": f"UC{i:03d}", "country_code": "KR", "priority": i % 3} for i in range(120)]
+        rows.append({"channel_id": "UCjp", "country_code": "JP", "priority": 5})
+        assert await channel_registry.import_tracked_channels(rows, chunk_size=50) == 121
+
+        batches = [batch async for batch in tracked_channel_batches("KR")]
+    finally:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+        await engine.dispose()
+
+    assert [len(batch) for batch in batches] == [50, 50, 20]
+    flat = [cid for batch in batches for cid in batch]
+    assert sorted(flat) == [f"UC{i:03d}" for i in range(120)]
+    assert all(int(cid[2:]) % 3 == 2 for cid in flat[:40])
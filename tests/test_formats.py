@@ -0,0 +1,27 @@
+import io
+import polars as pl
+from app.core.formats import ARROW_MEDIA_TYPE, format_channel_list, parse_fields, project_channels
+
+CHANNELS = [
+    {"channelId": "UC1", "title": "하나", "description": "긴 설명" * 50, "subscriberCount": 10},
+    {"channelId": "UC2", "title": "둘", "description": "긴 설명" * 50, "subscriberCount": 5},
+]
+
+def test_fields_projection_drops_unrequested_columns():
+    fields = parse_fields("channelId, subscriberCount,")
+
+    assert project_channels(CHANNELS, fields) == [
+        {"channelId": "UC1", "subscriberCount": 10},
+        {"channelId": "UC2", "subscriberCount": 5},
+    ]
+
+def test_arrow_output_round_trips():
+    payload = {"regionCode": "KR", "result_count": 2, "channels": CHANNELS}
+
+    response = format_channel_list(payload, "arrow", {})
+
+    assert response.media_type == ARROW_MEDIA_TYPE
+    assert response.headers["x-region-code"] == "KR"
+    frame = pl.read_ipc_stream(io.BytesIO(response.body))
+    assert frame["channelId"].to_list() == ["UC1", "UC2"]
+    assert frame["subscriberCount"].to_list() == [10, 5]
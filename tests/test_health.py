@@ -1,11 +1,24 @@
 
 import pytest
-from httpx import AsyncClient
+from httpx import ASGITransport, AsyncClient
 from app.main import app
+from app.services import warmup
 
 @pytest.mark.asyncio
 async def test_healthz():
-    async with AsyncClient(app=app, base_url="http://test") as ac:
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
         res = await ac.get("/healthz")
         assert res.status_code == 200
         assert res.json()["status"] == "ok"
+
+@pytest.mark.asyncio
+async def test_readyz_waits_for_warmup(monkeypatch):
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        monkeypatch.setattr(warmup, "_ready", False)
+        res = await ac.get("/readyz")
+        assert res.status_code == 503
+
+        monkeypatch.setattr(warmup, "_ready", True)
+        res = await ac.get("/readyz")
+        assert res.status_code == 200
+        assert res.json()["status"] == "ready"
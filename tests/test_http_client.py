@@ -0,0 +1,20 @@
+import pytest
+from app.core.http import init_http_client, close_http_client, get_http_client
+from app.services.utils import backoff_client
+
+@pytest.mark.asyncio
+async def test_backoff_client_reuses_shared_client():
+    shared = await init_http_client()
+    try:
+        async with backoff_client() as first:
+            pass
+        async with backoff_client() as second:
+            pass
+        assert first is shared
+        assert second is shared
+        assert not shared.is_closed
+    finally:
+        await close_http_client()
+
+    assert shared.is_closed
+    assert get_http_client() is None
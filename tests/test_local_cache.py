@@ -0,0 +1,34 @@
+import time
+from app.core.local_cache import LocalCache, MISSING
+
+def test_evicts_least_recently_used():
+    cache = LocalCache(max_entries=2)
+    cache.set("a", 1, ttl=60)
+    cache.set("b", 2, ttl=60)
+    assert cache.get("a") == 1
+
+    cache.set("c", 3, ttl=60)
+
+    assert cache.get("b") is MISSING
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+def test_expired_entries_are_misses(monkeypatch):
+    cache = LocalCache(max_entries=8)
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now)
+    cache.set("trending:KR:2026-10-16", {"channels": []}, ttl=5)
+
+    monkeypatch.setattr(time, "monotonic", lambda: now + 6)
+
+    assert cache.get("trending:KR:2026-10-16") is MISSING
+    assert len(cache) == 0
+
+def test_delete_pattern():
+    cache = LocalCache(max_entries=8)
+    cache.set("trending:KR:1", 1, ttl=60)
+    cache.set("trending:JP:1", 2, ttl=60)
+    cache.set("top_channels:2026-10", 3, ttl=60)
+
+    assert cache.delete_pattern("trending:*") == 2
+    assert cache.get("top_channels:2026-10") == 3
@@ -0,0 +1,35 @@
+from datetime import date
+from app.core import partitions
+from app.core.partitions import add_months, create_partition_sql, partition_month, partition_name
+from app.core.redis import acquire_lock
+
+def test_month_arithmetic_crosses_years():
+    assert add_months(date(2026, 11, 1), 2) == date(2027, 1, 1)
+    assert add_months(date(2026, 1, 1), -1) == date(2025, 12, 1)
+
+def test_partition_names_round_trip():
+    name = partition_name("trending_appearances", date(2026, 9, 1))
+
+    assert name == "trending_appearances_p2026_09"
+    assert partition_month("trending_appearances", name) == date(2026, 9, 1)
+    assert partition_month("trending_appearances", "trending_appearances_default") is None
+
+def test_timestamp_partitions_are_cut_at_utc_midnight():
+    sql = create_partition_sql("channel_stats_snapshots", "captured_at", date(2026, 12, 1))
+
+    assert "FROM ('2026-12-01 00:00:00+00') TO ('2027-01-01 00:00:00+00')" in sql
+
+async def test_maintenance_is_skipped_while_another_worker_holds_the_lock(live_redis, monkeypatch):
+    began = []
+
+    class RecordingEngine:
+        def begin(self):
+            began.append(1)
+            raise RuntimeError("no database")
+
+    monkeypatch.setattr(partitions, "engine", RecordingEngine())
+    assert await acquire_lock(partitions.MAINTENANCE_LOCK_NAME, ttl=60)
+
+    await partitions.maintain_partitions()
+
+    assert began == []
@@ -0,0 +1,67 @@
+from datetime import datetime, timezone
+import pytest
+from app.core import metrics
+from app.core.settings import settings
+from app.services import quota
+from app.services.quota import Priority, QuotaBudgetExceededError, get_quota_usage, reserve_quota
+
+
+@pytest.fixture
+def budgets(monkeypatch):
+    monkeypatch.setattr(settings, "youtube_daily_quota", 10)
+    monkeypatch.setattr(settings, "youtube_quota_budgets", {"low": 3, "normal": 6, "high": 10})
+
+
+async def test_reservations_under_budget_are_recorded(live_redis, budgets):
+    await reserve_quota("videos")
+    await reserve_quota("channels")
+    await reserve_quota("channels")
+
+    usage = await get_quota_usage()
+    assert usage["used"] == 3
+    assert usage["remaining"] == 7
+    assert usage["byEndpoint"] == {"videos": 1, "channels": 2}
+
+
+async def test_over_budget_reservation_is_refused_and_rolled_back(live_redis, budgets):
+    for _ in range(3):
+        await reserve_quota("videos", Priority.LOW)
+
+    with pytest.raises(QuotaBudgetExceededError):
+        await reserve_quota("videos", Priority.LOW)
+
+    usage = await get_quota_usage()
+    assert usage["used"] == 3
+    assert usage["byEndpoint"] == {"videos": 3}
+    assert metrics.snapshot()["youtube.quota_deferred.low"] == 1
+
+
+async def test_high_priority_spends_past_the_low_budget(live_redis, budgets):
+    for _ in range(3):
+        await reserve_quota("videos", Priority.LOW)
+    with pytest.raises(QuotaBudgetExceededError):
+        await reserve_quota("videos", Priority.LOW)
+
+    for _ in range(7):
+        await reserve_quota("videos", Priority.HIGH)
+    with pytest.raises(QuotaBudgetExceededError):
+        await reserve_quota("videos", Priority.HIGH)
+
+    assert (await get_quota_usage())["used"] == 10
+
+
+async def test_ledger_rolls_over_at_pacific_midnight(live_redis, budgets, monkeypatch):
+    # 06:59 UTC is still the previous day in Los Angeles (PDT, UTC-7); 07:00 starts the next
+    assert quota.quota_day(datetime(2026, 10, 16, 6, 59, tzinfo=timezone.utc)) == "2026-10-15"
+    assert quota.quota_day(datetime(2026, 10, 16, 7, 0, tzinfo=timezone.utc)) == "2026-10-16"
+
+    day = "2026-10-15"
+    monkeypatch.setattr(quota, "quota_day", lambda now=None: day)
+    for _ in range(3):
+        await reserve_quota("videos", Priority.LOW)
+
+    day = "2026-10-16"
+    await reserve_quota("videos", Priority.LOW)
+
+    assert (await get_quota_usage("2026-10-15"))["used"] == 3
+    assert (await get_quota_usage("2026-10-16"))["used"] == 1
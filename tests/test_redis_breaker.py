@@ -0,0 +1,56 @@
+import pytest
+from app.core import metrics
+from app.core import redis as redis_module
+from app.core.settings import settings
+
+
+@pytest.fixture
+async def dead_redis(monkeypatch):
+    # Nothing listens on port 1, so every connection attempt is refused
+    monkeypatch.setattr(settings, "redis_url", "redis://127.0.0.1:1/0")
+    monkeypatch.setattr(settings, "redis_breaker_threshold", 2)
+    monkeypatch.setattr(settings, "redis_breaker_backoff", 60.0)
+    await redis_module.close_redis()
+    metrics.reset()
+    yield
+    await redis_module.close_redis()
+
+
+async def test_breaker_opens_and_skips_redis(dead_redis):
+    assert await redis_module.cache_get("breaker:a") is None
+    assert await redis_module.cache_get("breaker:b") is None
+    assert redis_module.breaker_is_open()
+
+    assert await redis_module.cache_get("breaker:c") is None
+    assert await redis_module.get_redis() is None
+
+    snapshot = metrics.snapshot()
+    assert snapshot["redis.breaker.opened"] == 1
+    assert snapshot["redis.breaker.open"] == 1
+    assert snapshot["redis.breaker.skipped"] == 2
+
+
+class StopProbe(Exception):
+    pass
+
+
+async def test_probe_logs_the_capped_delay(dead_redis, monkeypatch, caplog):
+    delays = []
+
+    async def sleep(delay):
+        delays.append(delay)
+        if len(delays) == 3:
+            raise StopProbe
+
+    monkeypatch.setattr(settings, "redis_breaker_backoff", 1.0)
+    monkeypatch.setattr(settings, "redis_breaker_max_backoff", 1.5)
+    monkeypatch.setattr(redis_module.asyncio, "sleep", sleep)
+    monkeypatch.setattr(redis_module, "_breaker_open", True)
+
+    with caplog.at_level("WARNING", logger="app.core.redis"), pytest.raises(StopProbe):
+        await redis_module._probe_until_healthy()
+
+    # Each failure logs the delay the next sleep actually uses
+    logged = [record.getMessage() for record in caplog.records if "Redis probe failed" in record.getMessage()]
+    assert [message.split("retrying in ")[1].split("s:")[0] for message in logged] == ["1.5", "1.5"]
+    assert delays == [1.0, 1.5, 1.5]
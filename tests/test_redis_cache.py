@@ -0,0 +1,123 @@
+from app.core import metrics
+from app.core import redis as redis_module
+from app.core.redis import (
+    bump_namespace,
+    cache_clear_pattern,
+    cache_get,
+    cache_get_many,
+    cache_set,
+    cache_set_many,
+    namespaced_key,
+)
+from app.core.settings import settings
+from app.services.channel_cache import cache_channels, get_cached_channels, snippet_key, stats_key
+
+
+async def test_clear_pattern_unlinks_in_chunks_across_scan_pages(live_redis, monkeypatch):
+    monkeypatch.setattr(redis_module, "CLEAR_BATCH_SIZE", 100)
+    chunks = []
+    unlink_chunk = redis_module._unlink_chunk
+
+    async def record_chunk(client, keys):
+        chunks.append(len(keys))
+        return await unlink_chunk(client, keys)
+
+    monkeypatch.setattr(redis_module, "_unlink_chunk", record_chunk)
+    live_redis.mset({f"bulk:{i}": "1" for i in range(1050)})
+    live_redis.set("other", "1")
+
+    assert await cache_clear_pattern("bulk:*") == 1050
+
+    # SCAN may return a key twice while Redis rehashes after the bulk MSET; the repeat
+    # unlinks nothing, so only the chunk sizes can grow
+    assert len(chunks) >= 11
+    assert set(chunks[:-1]) == {100}
+    assert 0 < chunks[-1] <= 100
+    assert live_redis.keys("bulk:*") == []
+    assert live_redis.get("other") == b"1"
+
+
+async def test_clear_pattern_evicts_local_copies(live_redis):
+    live_redis.set("trending:KR:2026-10-16", '{"channels": []}')
+    assert await cache_get("trending:KR:2026-10-16") == {"channels": []}
+
+    await cache_clear_pattern("trending:KR:*")
+
+    assert await cache_get("trending:KR:2026-10-16") is None
+
+
+async def test_get_many_returns_only_hits_and_skips_undecodable_values(live_redis):
+    live_redis.set("a", '{"n": 1}')
+    live_redis.set("broken", "{not json")
+
+    found = await cache_get_many(["a", "missing", "broken"])
+
+    assert found == {"a": {"n": 1}}
+    snapshot = metrics.snapshot()
+    assert snapshot["cache.l2.hit"] == 1
+    assert snapshot["cache.l2.miss"] == 2
+
+    # The hit is now answered locally, the rest still go to Redis
+    live_redis.set("missing", '"late"')
+    assert await cache_get_many(["a", "missing"]) == {"a": {"n": 1}, "missing": "late"}
+    assert metrics.snapshot()["cache.l1.hit"] == 1
+
+
+async def test_set_many_applies_each_ttl(live_redis):
+    assert await cache_set_many([("short", {"v": 1}, 60), ("long", [1, 2], 3600)])
+
+    assert 0 < live_redis.ttl("short") <= 60
+    assert 3500 < live_redis.ttl("long") <= 3600
+    redis_module._l1.clear()
+    assert await cache_get_many(["short", "long"]) == {"short": {"v": 1}, "long": [1, 2]}
+
+
+async def test_set_many_reports_values_it_could_not_serialize(live_redis):
+    circular = []
+    circular.append(circular)
+
+    assert not await cache_set_many([("ok", 1, 60), ("bad", circular, 60)])
+
+    assert live_redis.get("ok") == b"1"
+    assert live_redis.get("bad") is None
+
+
+async def test_channel_cache_round_trip(live_redis):
+    items = [
+        {"id": "UCa", "snippet": {"title": "A"}, "statistics": {"subscriberCount": "1"}},
+        {"id": "UCb", "snippet": {"title": "B"}, "statistics": {"subscriberCount": "2"}},
+    ]
+    await cache_channels(items)
+    # Statistics expired for UCb: the channel is a miss even though its snippet is cached
+    live_redis.delete(stats_key("UCb"))
+    redis_module._l1.clear()
+
+    cached = await get_cached_channels(["UCa", "UCb", "UCc"])
+
+    assert cached == {"UCa": items[0]}
+    assert live_redis.ttl(snippet_key("UCa")) > settings.channel_stats_ttl
+
+
+async def test_bump_namespace_orphans_every_key(live_redis):
+    old_keys = [await namespaced_key("search", f"q{i}") for i in range(20)]
+    for key in old_keys:
+        assert await cache_set(key, {"hit": True})
+    await cache_set("other:q0", {"hit": True})
+
+    assert await bump_namespace("search") == 1
+
+    new_keys = [await namespaced_key("search", f"q{i}") for i in range(20)]
+    assert set(new_keys).isdisjoint(old_keys)
+    assert await cache_get_many(new_keys) == {}
+    assert await cache_get("other:q0") == {"hit": True}
+
+
+async def test_namespaced_key_skips_the_cache_when_the_generation_is_unreadable(monkeypatch):
+    # Nothing listens on port 1; generation 0 might name entries a bump already orphaned
+    monkeypatch.setattr(settings, "redis_url", "redis://127.0.0.1:1/0")
+    await redis_module.close_redis()
+    redis_module._l1.clear()
+    try:
+        assert await namespaced_key("search", "q0") is None
+    finally:
+        await redis_module.close_redis()
@@ -0,0 +1,74 @@
+import httpx
+import pytest
+from tenacity import wait_none
+from app.core import metrics
+from app.services import utils
+from app.services.utils import limited_get, QuotaExceededError
+
+BASE = "https://www.googleapis.com/youtube/v3"
+
+def quota_error(reason: str) -> httpx.Response:
+    return httpx.Response(403, json={"error": {"errors": [{"reason": reason}]}})
+
+@pytest.fixture(autouse=True)
+def reset_governor(monkeypatch):
+    metrics.reset()
+    monkeypatch.setattr(utils, "_limiters", {})
+    monkeypatch.setattr(utils, "_semaphore", None)
+    monkeypatch.setattr(utils, "_quota_exhausted_until", None)
+
+    async def no_ledger(endpoint, priority):
+        return None
+
+    monkeypatch.setattr(utils, "reserve_quota", no_ledger)
+
+@pytest.mark.asyncio
+async def test_retries_rate_limited_responses():
+    responses = [httpx.Response(429), httpx.Response(503), httpx.Response(200, json={"items": []})]
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return responses[len(calls) - 1]
+
+    fast_get = limited_get.retry_with(wait=wait_none())
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        resp = await fast_get(client, f"{BASE}/channels")
+
+    assert resp.json() == {"items": []}
+    assert len(calls) == 3
+    assert metrics.snapshot()["youtube.retried"] == 2
+
+@pytest.mark.asyncio
+async def test_quota_exceeded_is_not_retried_and_fails_fast():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return quota_error("quotaExceeded")
+
+    fast_get = limited_get.retry_with(wait=wait_none())
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        with pytest.raises(QuotaExceededError):
+            await fast_get(client, f"{BASE}/search")
+        with pytest.raises(QuotaExceededError):
+            await fast_get(client, f"{BASE}/channels")
+
+    assert len(calls) == 1
+    assert metrics.snapshot()["youtube.quota_rejected"] == 1
+
+@pytest.mark.asyncio
+async def test_rate_limit_403_is_retried():
+    responses = [quota_error("userRateLimitExceeded"), httpx.Response(200, json={})]
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return responses[len(calls) - 1]
+
+    fast_get = limited_get.retry_with(wait=wait_none())
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        resp = await fast_get(client, f"{BASE}/videos")
+
+    assert resp.status_code == 200
+    assert len(calls) == 2
@@ -0,0 +1,31 @@
+from starlette.requests import Request
+from app.core.response_cache import CachedResponse, gzip_etag, make_etag, to_response
+
+def make_request(headers: dict) -> Request:
+    raw = [(k.lower().encode(), v.encode()) for k, v in headers.items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": raw})
+
+def test_gzip_variant_has_its_own_etag():
+    entry = CachedResponse(b'{"KR":[' + b'{"title":"channel"},' * 100 + b'{}]}')
+    etag = make_etag("top-channels", "2026-10", "2026-10-01T00:00:00+00:00")
+
+    plain = to_response(make_request({}), entry, etag=etag)
+    gzipped = to_response(make_request({"Accept-Encoding": "gzip"}), entry, etag=etag)
+
+    assert plain.headers["etag"] == etag
+    assert gzipped.headers["etag"] == gzip_etag(etag)
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert len(gzipped.body) < len(plain.body)
+
+def test_if_none_match_returns_304_for_either_variant():
+    entry = CachedResponse(b'{"KR":[]}')
+    etag = make_etag("trending", "KR", "2026-10-16", 50)
+
+    for held in (etag, f"W/{gzip_etag(etag)}", f'"other", {etag}'):
+        response = to_response(make_request({"If-None-Match": held}), entry, etag=etag, cache_control="public")
+        assert response.status_code == 304
+        assert response.body == b""
+        assert response.headers["cache-control"] == "public"
+
+    response = to_response(make_request({"If-None-Match": '"other"'}), entry, etag=etag)
+    assert response.status_code == 200
@@ -0,0 +1,55 @@
+import asyncio
+import pytest
+from app.core.singleflight import SingleFlight
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight("test")
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"channels": [1, 2, 3]}
+
+    results = await asyncio.gather(*[flight.do(("KR", 50), fetch) for _ in range(20)])
+
+    assert calls == 1
+    assert all(r == {"channels": [1, 2, 3]} for r in results)
+    assert flight.inflight() == 0
+
+@pytest.mark.asyncio
+async def test_errors_propagate_to_all_waiters_and_are_not_cached():
+    flight = SingleFlight("test")
+    calls = 0
+
+    async def fail():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream down")
+
+    results = await asyncio.gather(*[flight.do("KR", fail) for _ in range(5)], return_exceptions=True)
+    assert calls == 1
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+    with pytest.raises(RuntimeError):
+        await flight.do("KR", fail)
+    assert calls == 2
+
+@pytest.mark.asyncio
+async def test_cancelled_leader_does_not_cancel_shared_fetch():
+    flight = SingleFlight("test")
+
+    async def fetch():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    leader = asyncio.create_task(flight.do("JP", fetch))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(flight.do("JP", fetch))
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    assert await follower == "done"
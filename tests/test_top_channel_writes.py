@@ -0,0 +1,70 @@
+import os
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+import app.models  # noqa: F401  register every table on Base.metadata
+from app.core.database import Base
+from app.models.top_channel import TopChannel
+from app.services.top_channels_service import changed_top_channel_rows, top_channel_rows, upsert_country_channels
+
+# Same disposable database as tests/test_query_plans.py
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+needs_database = pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL is not set")
+
+
+def channel(index, subscribers):
+    return {
+        "channelId": f"UC{index}",
+        "title": f"Channel {index}",
+        "description": "",
+        "thumbnailUrl": "u",
+        "subscriberCount": subscribers,
+        "videoCount": 1,
+        "viewCount": 1,
+    }
+
+
+@pytest.fixture
+async def session():
+    engine = create_async_engine(TEST_DATABASE_URL)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSession(engine) as session:
+        yield session
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+    await engine.dispose()
+
+
+def test_changed_rows_compares_each_rank():
+    stored = {row["rank"]: row for row in top_channel_rows("KR", [channel(1, 300), channel(2, 200)])}
+    rows = top_channel_rows("KR", [channel(1, 300), channel(3, 250), channel(2, 200)])
+
+    assert [row["rank"] for row in changed_top_channel_rows(stored, rows)] == [2, 3]
+    assert changed_top_channel_rows(stored, rows[:1]) == []
+
+
+@needs_database
+async def test_only_changed_ranks_are_written(session):
+    ranking = [channel(1, 300), channel(2, 200), channel(3, 100)]
+    assert await upsert_country_channels(session, "KR", ranking) == 3
+    await session.commit()
+
+    assert await upsert_country_channels(session, "KR", ranking) == 0
+    created = dict((await session.execute(select(TopChannel.rank, TopChannel.created_at))).all())
+
+    # Channel 3 passes channel 2: two ranks change, rank 1 stays untouched
+    ranking = [channel(1, 300), channel(3, 250), channel(2, 200)]
+    assert await upsert_country_channels(session, "KR", ranking) == 2
+
+    assert await upsert_country_channels(session, "KR", ranking[:2]) == 0
+    await session.commit()
+
+    rows = (await session.execute(
+        select(TopChannel.rank, TopChannel.channel_id, TopChannel.created_at).order_by(TopChannel.rank)
+    )).all()
+    assert [(rank, channel_id) for rank, channel_id, _ in rows] == [(1, "UC1"), (2, "UC3")]
+    # Rewritten ranks keep the time the row was created
+    assert [created_at for _, _, created_at in rows] == [created[1], created[2]]
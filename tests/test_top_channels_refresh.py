@@ -0,0 +1,245 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+import pytest
+from app.core import redis as redis_module
+from app.core.settings import settings
+from app.models.channel import Channel
+from app.services import top_channels_service
+from app.services.top_channels_service import schedule_top_channels_refresh
+
+
+@pytest.fixture
+async def refresh_state(monkeypatch):
+    monkeypatch.setattr(top_channels_service, "_refresh_task", None)
+    monkeypatch.setattr(top_channels_service, "_last_failure", None)
+    yield
+
+
+async def test_failed_refresh_is_not_retried_without_redis(refresh_state, monkeypatch):
+    # Nothing listens on port 1, so the refresh lock fails open
+    monkeypatch.setattr(settings, "redis_url", "redis://127.0.0.1:1/0")
+    await redis_module.close_redis()
+    attempts = []
+
+    async def update_top_channels(countries=None):
+        attempts.append(1)
+        raise RuntimeError("quota exhausted")
+
+    monkeypatch.setattr(top_channels_service, "update_top_channels", update_top_channels)
+
+    try:
+        assert schedule_top_channels_refresh()
+        await top_channels_service._refresh_task
+
+        assert not schedule_top_channels_refresh()
+        assert attempts == [1]
+    finally:
+        await redis_module.close_redis()
+
+
+class EmptyResult:
+    def scalars(self):
+        return self
+
+    def all(self):
+        return []
+
+    def scalar(self):
+        return None
+
+
+class EmptySession:
+    async def execute(self, statement):
+        return EmptyResult()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+async def test_post_refresh_warm_up_does_not_schedule_a_refresh(refresh_state, live_redis, monkeypatch):
+    scheduled = []
+    monkeypatch.setattr(top_channels_service, "async_session_maker", EmptySession)
+    monkeypatch.setattr(top_channels_service, "schedule_top_channels_refresh", lambda countries=None: scheduled.append(1))
+
+    # Nothing stored yet, so the ranking looks stale
+    await top_channels_service.warm_top_channels_cache()
+
+    assert scheduled == []
+
+
+class KnownChannelsSession(EmptySession):
+    def __init__(self, channels):
+        self.channels = channels
+
+    async def execute(self, statement):
+        return self
+
+    def scalars(self):
+        return self.channels
+
+
+async def test_incremental_fetch_splits_on_last_fetched_at(monkeypatch):
+    now = datetime.now(timezone.utc)
+    known = [
+        Channel(channel_id="UCfresh", title="Fresh", description="d", thumbnail_url="t",
+                custom_url="@fresh", country="KR", published_at="2020", last_fetched_at=now - timedelta(days=1)),
+        Channel(channel_id="UCold", title="Old", description="d", thumbnail_url="t",
+                last_fetched_at=now - timedelta(days=30)),
+        Channel(channel_id="UCnever", title="Never", description="d", thumbnail_url="t"),
+    ]
+    calls = {}
+
+    async def get_channels_by_ids(channel_ids, priority, use_cache):
+        calls["full"] = (channel_ids, use_cache)
+        return [
+            {"channelId": cid, "title": cid, "description": "", "thumbnailUrl": "u",
+             "subscriberCount": 5, "videoCount": 1, "viewCount": 1}
+            for cid in channel_ids
+        ]
+
+    async def get_channel_statistics(channel_ids, priority):
+        calls["statistics"] = channel_ids
+        return {"UCfresh": {"subscriberCount": 9, "videoCount": 2, "viewCount": 3}}
+
+    monkeypatch.setattr(top_channels_service, "async_session_maker", lambda: KnownChannelsSession(known))
+    monkeypatch.setattr(top_channels_service, "get_channels_by_ids", get_channels_by_ids)
+    monkeypatch.setattr(top_channels_service, "get_channel_statistics", get_channel_statistics)
+
+    channels, full = await top_channels_service.fetch_channels_incremental(["UCfresh", "UCold", "UCnever", "UCnew"])
+
+    assert calls["statistics"] == ["UCfresh"]
+    assert calls["full"] == (["UCold", "UCnever", "UCnew"], False)
+    assert [channel["channelId"] for channel in full] == ["UCold", "UCnever", "UCnew"]
+    fresh = next(channel for channel in channels if channel["channelId"] == "UCfresh")
+    assert fresh["title"] == "Fresh"
+    assert fresh["customUrl"] == "@fresh"
+    assert fresh["subscriberCount"] == 9
+
+
+class SnippetSession:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def commit(self):
+        pass
+
+
+async def test_country_fetch_keeps_only_the_top_n_across_batches(monkeypatch):
+    monkeypatch.setattr(settings, "top_channels_per_country", 3)
+    saved = []
+
+    async def tracked_channel_batches(country_code):
+        for page in range(4):
+            yield [f"UC{page}-{i}" for i in range(5)]
+
+    async def fetch_channels_incremental(channel_ids):
+        channels = [
+            {"channelId": cid, "subscriberCount": int(cid[2]) * 10 + int(cid[-1])}
+            for cid in channel_ids
+        ]
+        return channels, channels[:1]
+
+    async def save_fetched_channels(session, channels, now):
+        saved.extend(channel["channelId"] for channel in channels)
+
+    monkeypatch.setattr(top_channels_service, "tracked_channel_batches", tracked_channel_batches)
+    monkeypatch.setattr(top_channels_service, "fetch_channels_incremental", fetch_channels_incremental)
+    monkeypatch.setattr(top_channels_service, "save_fetched_channels", save_fetched_channels)
+    monkeypatch.setattr(top_channels_service, "async_session_maker", SnippetSession)
+
+    channels = await top_channels_service.fetch_country_channels("KR")
+
+    assert [channel["channelId"] for channel in channels] == ["UC3-4", "UC3-3", "UC3-2"]
+    assert sorted(saved) == ["UC0-0", "UC1-0", "UC2-0", "UC3-0"]
+
+
+async def test_update_ranks_every_registry_country(monkeypatch):
+    refreshed = []
+
+    async def tracked_countries(session):
+        return ["BR", "KR"]
+
+    async def refresh_country(country_code, semaphore):
+        refreshed.append(country_code)
+        return 0
+
+    async def noop(*args, **kwargs):
+        pass
+
+    monkeypatch.setattr(top_channels_service, "async_session_maker", EmptySession)
+    monkeypatch.setattr(top_channels_service, "tracked_countries", tracked_countries)
+    monkeypatch.setattr(top_channels_service, "refresh_country", refresh_country)
+    monkeypatch.setattr(top_channels_service, "cache_delete", noop)
+    monkeypatch.setattr(top_channels_service, "warm_top_channels_cache", noop)
+
+    await top_channels_service.update_top_channels()
+
+    assert sorted(refreshed) == ["BR", "KR"]
+
+
+class RowsResult(EmptyResult):
+    def __init__(self, rows):
+        self.rows = rows
+
+    def all(self):
+        return self.rows
+
+
+class ScriptedSession(EmptySession):
+    # Answers execute() calls in order
+    def __init__(self, *results):
+        self.results = list(results)
+
+    async def execute(self, statement):
+        return self.results.pop(0)
+
+
+async def test_stale_countries_are_checked_and_refreshed_one_by_one(refresh_state, monkeypatch):
+    _, month_start = top_channels_service.current_month_kst()
+    refreshed = [
+        SimpleNamespace(country_code="KR", refreshed_at=month_start + timedelta(hours=1)),
+        SimpleNamespace(country_code="JP", refreshed_at=month_start - timedelta(days=3)),
+    ]
+    session = ScriptedSession(
+        RowsResult(["JP", "KR", "US"]),
+        RowsResult([]),
+        RowsResult(refreshed),
+    )
+    scheduled = []
+    monkeypatch.setattr(
+        top_channels_service, "schedule_top_channels_refresh",
+        lambda countries=None: scheduled.append(countries),
+    )
+
+    grouped, ttl, _ = await top_channels_service.load_top_channels(session)
+
+    assert scheduled == [["JP", "US"]]
+    assert ttl is None
+    assert grouped == {"JP": [], "KR": [], "US": []}
+
+
+async def test_partial_failure_backs_off_before_retrying(refresh_state, monkeypatch):
+    monkeypatch.setattr(settings, "redis_url", "redis://127.0.0.1:1/0")
+    await redis_module.close_redis()
+    requested = []
+
+    async def update_top_channels(countries=None):
+        requested.append(countries)
+        return ["US"]
+
+    monkeypatch.setattr(top_channels_service, "update_top_channels", update_top_channels)
+
+    try:
+        assert schedule_top_channels_refresh(["JP", "US"])
+        await top_channels_service._refresh_task
+
+        assert requested == [["JP", "US"]]
+        assert not schedule_top_channels_refresh(["US"])
+    finally:
+        await redis_module.close_redis()
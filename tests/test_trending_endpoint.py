@@ -0,0 +1,63 @@
+import msgpack
+import pytest
+from httpx import ASGITransport, AsyncClient
+from app.api.endpoints import search
+from app.core.database import get_db
+from app.core.response_cache import gzip_etag
+from app.main import app
+
+
+def trending(count):
+    return {
+        "regionCode": "KR",
+        "result_count": count,
+        "channels": [{"channelId": f"UC{i:022d}", "title": f"Channel {i}", "subscriberCount": i} for i in range(count)],
+    }
+
+
+@pytest.fixture
+async def client(monkeypatch):
+    async def no_db():
+        yield None
+
+    app.dependency_overrides[get_db] = no_db
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            yield ac
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+
+
+def serve(monkeypatch, payload):
+    async def get_trending_channels_with_cache(db, region_code, max_results):
+        return payload
+
+    monkeypatch.setattr(search, "get_trending_channels_with_cache", get_trending_channels_with_cache)
+
+
+async def test_small_bodies_keep_the_plain_etag(client, monkeypatch):
+    serve(monkeypatch, trending(1))
+
+    res = await client.get("/api/trending/channels", headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in res.headers
+    assert not res.headers["etag"].endswith('-gz"')
+
+
+async def test_compressed_bodies_get_the_gzip_etag(client, monkeypatch):
+    serve(monkeypatch, trending(50))
+
+    res = await client.get("/api/trending/channels", params={"format": "json"}, headers={"Accept-Encoding": "gzip"})
+    plain = await client.get("/api/trending/channels", headers={"Accept-Encoding": "identity"})
+
+    assert res.headers["content-encoding"] == "gzip"
+    assert res.headers["etag"] == gzip_etag(plain.headers["etag"])
+
+
+async def test_msgpack_output(client, monkeypatch):
+    serve(monkeypatch, trending(2))
+
+    res = await client.get("/api/trending/channels", params={"format": "msgpack"})
+
+    assert res.headers["content-type"] == "application/msgpack"
+    assert msgpack.unpackb(res.content) == trending(2)
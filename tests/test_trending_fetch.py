@@ -0,0 +1,125 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import date
+from app.core.redis import acquire_lock
+from app.services import search_service
+from app.services.quota import Priority
+from app.services.search_service import fetch_and_save_trending
+
+
+@asynccontextmanager
+async def no_session():
+    yield None
+
+
+async def test_lost_lock_race_reads_the_stored_result(monkeypatch):
+    stored = {"regionCode": "KR", "result_count": 1, "channels": [{"channelId": "UCa"}]}
+    db_reads = []
+    upstream = []
+
+    async def acquire_lock(name, ttl):
+        return None
+
+    async def wait_for_lock_release(name, timeout):
+        return False
+
+    async def get_trending_from_db(session, region_code):
+        db_reads.append(region_code)
+        return stored if len(db_reads) > 1 else None
+
+    async def get_trending_channels(**kwargs):
+        upstream.append(kwargs)
+
+    monkeypatch.setattr(search_service, "async_session_maker", no_session)
+    monkeypatch.setattr(search_service, "acquire_lock", acquire_lock)
+    monkeypatch.setattr(search_service, "wait_for_lock_release", wait_for_lock_release)
+    monkeypatch.setattr(search_service, "get_trending_from_db", get_trending_from_db)
+    monkeypatch.setattr(search_service, "get_trending_channels", get_trending_channels)
+
+    assert await fetch_and_save_trending("KR") == stored
+    assert upstream == []
+
+
+async def test_lock_wait_timeout_falls_back_without_fetching(monkeypatch):
+    stale = {"regionCode": "KR", "result_count": 1, "channels": [], "stale": True}
+    upstream = []
+
+    async def acquire_lock(name, ttl):
+        return None
+
+    async def wait_for_lock_release(name, timeout):
+        return False
+
+    async def get_trending_from_db(session, region_code):
+        return None
+
+    async def get_latest_trending_from_db(session, region_code):
+        return stale
+
+    async def get_trending_channels(**kwargs):
+        upstream.append(kwargs)
+
+    monkeypatch.setattr(search_service, "TRENDING_LOCK_TTL", 0)
+    monkeypatch.setattr(search_service, "async_session_maker", no_session)
+    monkeypatch.setattr(search_service, "acquire_lock", acquire_lock)
+    monkeypatch.setattr(search_service, "wait_for_lock_release", wait_for_lock_release)
+    monkeypatch.setattr(search_service, "get_trending_from_db", get_trending_from_db)
+    monkeypatch.setattr(search_service, "get_latest_trending_from_db", get_latest_trending_from_db)
+    monkeypatch.setattr(search_service, "get_trending_channels", get_trending_channels)
+
+    assert await fetch_and_save_trending("KR") == stale
+    assert upstream == []
+
+
+async def test_prefetch_fetches_at_normal_priority(monkeypatch):
+    fetched = []
+
+    async def cache_get(key):
+        return None
+
+    async def get_trending_from_db(session, region_code):
+        return None
+
+    async def fetch_and_save_trending(region_code, priority):
+        fetched.append((region_code, priority))
+        return {"regionCode": region_code, "result_count": 0, "channels": []}
+
+    monkeypatch.setattr(search_service.settings, "trending_regions", ["KR"])
+    monkeypatch.setattr(search_service, "async_session_maker", no_session)
+    monkeypatch.setattr(search_service, "cache_get", cache_get)
+    monkeypatch.setattr(search_service, "get_trending_from_db", get_trending_from_db)
+    monkeypatch.setattr(search_service, "fetch_and_save_trending", fetch_and_save_trending)
+
+    await search_service.prefetch_trending()
+
+    assert fetched == [("KR", Priority.NORMAL)]
+
+
+async def test_lock_outlives_its_ttl_while_the_fetch_retries(live_redis, monkeypatch):
+    lock_name = f"trending:KR:{date.today().isoformat()}"
+    second_worker = []
+
+    async def get_trending_from_db(session, region_code):
+        return None
+
+    async def get_trending_channels(**kwargs):
+        # A fetch backing off past the 1s TTL; another worker must still find it locked
+        await asyncio.sleep(1.5)
+        second_worker.append(await acquire_lock(lock_name, ttl=1))
+        return {"channels": [{"channelId": "UCa"}]}
+
+    async def noop(*args, **kwargs):
+        pass
+
+    monkeypatch.setattr(search_service, "TRENDING_LOCK_TTL", 1)
+    monkeypatch.setattr(search_service, "async_session_maker", no_session)
+    monkeypatch.setattr(search_service, "get_trending_from_db", get_trending_from_db)
+    monkeypatch.setattr(search_service, "get_trending_channels", get_trending_channels)
+    monkeypatch.setattr(search_service, "save_trending_to_db", noop)
+    monkeypatch.setattr(search_service, "cache_set", noop)
+
+    result = await fetch_and_save_trending("KR")
+
+    assert result["result_count"] == 1
+    assert second_worker == [None]
+    assert not live_redis.exists(f"lock:{lock_name}")